@@ -1,7 +1,7 @@
 import asyncio
+import contextlib
+import io
 import logging
-from pathlib import Path
-import uuid
 import validators
 import discord
 from discord.interactions import Interaction
@@ -11,7 +11,12 @@ from dotenv import load_dotenv
 import os
 import yt_dlp as youtube_dl
 import datetime
-from subclasses import filebin, glyph_tools
+from subclasses import filebin, glyph_tools, glyph_visualizer, glyph_autogen, glyph_sync, media_info, audio_trim
+from subclasses.job_scheduler import media_jobs, QueueFullError
+from subclasses.glyph_db import glyphs
+from subclasses.bin_watcher import bin_watcher
+from subclasses.bin_pool import bin_pool
+from subclasses.source_cache import source_cache
 
 make_ephemeral = False
 
@@ -23,7 +28,30 @@ intents = discord.Intents()
 intents.members = True
 intents.message_content = True
 
-bot = commands.AutoShardedBot(intents=intents, sync_commands=False, help_command=None)
+class GlyphBot(commands.AutoShardedBot):
+    """
+    The bot, with hooks to open and close the shared resources it owns.
+    """
+    async def start(self, *args, **kwargs):
+        # open the pooled filebin client and the database before connecting to the gateway
+        await filebin.open_client()
+        await glyphs.open()
+        await source_cache.load()
+        bin_watcher.start()
+        bin_pool.start()
+        await super().start(*args, **kwargs)
+
+    async def close(self):
+        try:
+            await super().close()
+        finally:
+            await bin_watcher.stop()
+            await bin_pool.stop()
+            await filebin.close_client()
+            await glyphs.close()
+            media_info.shutdown()
+
+bot = GlyphBot(intents=intents, sync_commands=False, help_command=None)
 
 timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
 
@@ -125,9 +153,8 @@ async def dl_trim(ctx: discord.ApplicationContext,
         await ctx.respond(content=f"Error validating URL: {str(e)}", ephemeral=True)
         return
 
-    ydl = youtube_dl.YoutubeDL()
     try:
-        info = ydl.extract_info(url, download=False)
+        info = await media_info.extract_info(url)
     except youtube_dl.DownloadError:
         await ctx.respond(content="Error extracting info from the URL.", ephemeral=True)
         return
@@ -136,8 +163,6 @@ async def dl_trim(ctx: discord.ApplicationContext,
         end = info['duration']
     title = info['title']
 
-    title += f"_{uuid.uuid4()}"
-
     # Validate begin and end times
     try:
         begin = float(begin)
@@ -150,56 +175,187 @@ async def dl_trim(ctx: discord.ApplicationContext,
         await ctx.respond(content="Invalid begin or end time.", ephemeral=True)
         return
 
-    # use youtube-dl to download the audio file from the url and trim it to the specified time range
-    ydl_opts = {
-        'format': 'bestaudio/best',
-        'outtmpl': f'{title}.%(ext)s',
-        'restrictfilenames': True,
-        'noplaylist': True,
-        'quiet': True,
-        'no_warnings': True,
-        'nooverwrites': True,
-        'postprocessors': [{
-            'key': 'FFmpegExtractAudio',
-            'preferredcodec': 'opus',
-            'preferredquality': '192',
-        }],
-    }
-    loop = asyncio.get_event_loop()
-    with youtube_dl.YoutubeDL(ydl_opts) as ydl:
+    # trim from the cached source or the remote stream, downloading the whole source only as a fallback
+    # the download and ffmpeg run on the media job scheduler so a burst of commands can't swamp the host
+    audio_format = media_info.select_audio_format(info)
+    queued = False
+
+    async def on_position(position: int):
+        nonlocal queued
+        queued = True
+        await ctx.edit(content=f"⏳ Your request is queued at position {position}. Your audio will be trimmed shortly.")
+
+    try:
+        clip = await media_jobs.submit(lambda: audio_trim.trim(info, audio_format, begin, end), user_id=ctx.author.id, guild_id=ctx.guild_id, on_position=on_position)
+    except QueueFullError as e:
+        await ctx.respond(content=f"{e} Please try again later.", ephemeral=True)
+        return
+    except youtube_dl.DownloadError as e:
+        await ctx.respond(content=f"Error downloading the audio file: {e}", ephemeral=True)
+        return
+    except audio_trim.TrimError as e:
+        # Handle the error if ffmpeg failed
+        await ctx.respond(content=f"Error trimming the audio file: {e.stderr}", ephemeral=True)
+        return
+
+    # Send the audio file straight from memory, replacing the queue position message if there is one
+    audio_file = discord.File(io.BytesIO(clip), filename=f'{title}.ogg')
+    if queued:
+        await ctx.edit(content="Here's your audio! Enjoy! 🎵", file=audio_file)
+    else:
+        await ctx.respond(content="Here's your audio! Enjoy! 🎵", file=audio_file)
+
+@bot.slash_command(integration_types={discord.IntegrationType.guild_install, discord.IntegrationType.user_install}, name="visualize", description="Render a custom glyph as a video of the phone's lights")
+async def visualize(ctx: discord.ApplicationContext,
+                    glyph: discord.Attachment = discord.Option(discord.Attachment, name="glyph", description="The .nglyph or label file", required=True),
+                    url: str = discord.Option(name="audio_url", description="The audio to play along with the glyph", default=None),
+                    begin: float = discord.Option(name="start_time", description="Where the glyph starts in the audio in seconds", default=0.0),
+                    resolution: int = discord.Option(name="resolution", description="The height of the video", choices=list(glyph_visualizer.RESOLUTIONS), default=480),
+                    output_format: str = discord.Option(name="format", description="MP4 with audio or a silent GIF", choices=list(glyph_visualizer.FORMATS), default="mp4")):
+    """
+    Command to render a custom glyph as a video.
+    """
+    logger.info(f"{ctx.author} used /visualize command in {ctx.channel} on {ctx.guild}.")
+
+    # acknowledge the command without sending a response
+    await ctx.defer()
+
+    if glyph.size > filebin.MAX_FILE_BYTES:
+        await ctx.respond(content=f"<:glyphError:1223680333820596294> {glyph.filename} is {glyph.size // 1024} KiB, the limit is {filebin.MAX_FILE_BYTES // 1024} KiB.", ephemeral=True)
+        return
+    try:
+        # parsing a large label file takes a while, keep it off the event loop
+        timeline = await asyncio.to_thread(glyph_tools.load_glyph_file, glyph.filename, await glyph.read())
+    except glyph_tools.GlyphFormatError as e:
+        await ctx.respond(content=f"<:glyphError:1223680333820596294> {glyph.filename} is not a valid glyph file: {e}", ephemeral=True)
+        return
+    if len(timeline.frames) == 0:
+        await ctx.respond(content=f"<:glyphError:1223680333820596294> {glyph.filename} has no frames to visualize.", ephemeral=True)
+        return
+
+    info = None
+    if url is not None and output_format == 'mp4':
+        if not validators.url(url):
+            await ctx.respond(content="Invalid URL provided.", ephemeral=True)
+            return
         try:
-            await loop.run_in_executor(None, lambda: ydl.download([url]))
-        except youtube_dl.DownloadError as e:
-            await ctx.respond(content=f"Error downloading the audio file: {e}", ephemeral=True)
+            info = await media_info.extract_info(url)
+        except youtube_dl.DownloadError:
+            await ctx.respond(content="Error extracting info from the URL.", ephemeral=True)
+            return
+        if begin < 0.0 or begin >= info['duration']:
+            await ctx.respond(content="Invalid start time.", ephemeral=True)
             return
 
-    # Run ffmpeg using asyncio.create_subprocess_exec
-    ffmpeg_cmd = ['ffmpeg', '-i', f'{title}.opus', '-ab', '189k', '-ss', str(begin), '-t', str(end - begin), '-acodec', 'libopus', f'{title}.ogg']
-    process = await asyncio.create_subprocess_exec(*ffmpeg_cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE)
-    stdout, stderr = await process.communicate()
+    async def render():
+        audio = None
+        if info is not None:
+            end = min(info['duration'], begin + timeline.duration_ms / 1000)
+            audio = await audio_trim.trim(info, media_info.select_audio_format(info), begin, end)
+        return await glyph_visualizer.render(timeline, resolution, output_format, audio)
 
-    if process.returncode != 0:
-        # Handle the error if ffmpeg failed
-        await ctx.respond(content=f"Error trimming the audio file: {stderr.decode()}", ephemeral=True)
+    queued = False
+
+    async def on_position(position: int):
+        nonlocal queued
+        queued = True
+        await ctx.edit(content=f"⏳ Your visualization is queued at position {position}.")
+
+    try:
+        video = await media_jobs.submit(render, user_id=ctx.author.id, guild_id=ctx.guild_id, on_position=on_position)
+    except QueueFullError as e:
+        await ctx.respond(content=f"{e} Please try again later.", ephemeral=True)
+        return
+    except youtube_dl.DownloadError as e:
+        await ctx.respond(content=f"Error downloading the audio file: {e}", ephemeral=True)
         return
+    except (audio_trim.TrimError, glyph_visualizer.RenderError) as e:
+        await ctx.respond(content=f"Error rendering the visualization: {e.stderr[-1500:]}", ephemeral=True)
+        return
+
+    content = f"Here's your glyph on the {timeline.phone_name}! ✨"
+    video_file = discord.File(io.BytesIO(video), filename=f"{glyph.filename.rsplit('.', 1)[0]}.{output_format}")
+    if queued:
+        await ctx.edit(content=content, file=video_file)
+    else:
+        await ctx.respond(content=content, file=video_file)
+
+@bot.slash_command(integration_types={discord.IntegrationType.guild_install, discord.IntegrationType.user_install}, name="autoglyph", description="Generate a custom glyph from the beats of a song")
+async def autoglyph(ctx: discord.ApplicationContext,
+                    url: str = discord.Option(name="audio_url", description="The audio file URL", required=True),
+                    begin: float = discord.Option(name="start_time", description="The time to start the glyph in seconds", default=0.0),
+                    end: float = discord.Option(name="end_time", description="The time to end the glyph in seconds", default=None),
+                    phone: str = discord.Option(name="phone", description="The phone to generate the glyph for", choices=["Phone (1)", "Phone (2)", "Phone (2a)"], default="Phone (2)")):
+    """
+    Command to generate a custom glyph from audio.
+    """
+    logger.info(f"{ctx.author} used /autoglyph command in {ctx.channel} on {ctx.guild}.")
 
-    # Send the audio file
+    # acknowledge the command without sending a response
+    await ctx.defer()
+
+    if not validators.url(url):
+        await ctx.respond(content="Invalid URL provided.", ephemeral=True)
+        return
     try:
-        await ctx.respond(content="Here's your audio! Enjoy! 🎵", file=discord.File(f'{title}.ogg'))
-    finally:
-        # Clean up files
-        for extension in ['.opus', '.ogg']:
-            audio_file = Path(f'{title}{extension}')
-            if audio_file.is_file():
-                audio_file.unlink()
+        info = await media_info.extract_info(url)
+    except youtube_dl.DownloadError:
+        await ctx.respond(content="Error extracting info from the URL.", ephemeral=True)
+        return
+
+    if end is None:
+        end = info['duration']
+    if begin < 0.0 or end < 0.0 or begin >= end or end > info['duration']:
+        await ctx.respond(content="Invalid begin or end time.", ephemeral=True)
+        return
+
+    phone_model = next(model for model, name in glyph_tools.PHONE_NAMES.items() if name == phone)
+    audio_format = media_info.select_audio_format(info)
+
+    async def generate():
+        clip = await audio_trim.trim(info, audio_format, begin, end)
+        return clip, await glyph_autogen.generate(clip, phone_model)
+
+    queued = False
+
+    async def on_position(position: int):
+        nonlocal queued
+        queued = True
+        await ctx.edit(content=f"⏳ Your glyph is queued at position {position}.")
+
+    try:
+        clip, timeline = await media_jobs.submit(generate, user_id=ctx.author.id, guild_id=ctx.guild_id, on_position=on_position)
+    except QueueFullError as e:
+        await ctx.respond(content=f"{e} Please try again later.", ephemeral=True)
+        return
+    except youtube_dl.DownloadError as e:
+        await ctx.respond(content=f"Error downloading the audio file: {e}", ephemeral=True)
+        return
+    except audio_trim.TrimError as e:
+        await ctx.respond(content=f"Error trimming the audio file: {e.stderr}", ephemeral=True)
+        return
+    except glyph_autogen.DecodeError as e:
+        await ctx.respond(content=f"Error analysing the audio: {e.stderr[-1500:]}", ephemeral=True)
+        return
+
+    title = info['title']
+    content = f"Here's your generated glyph for the {timeline.phone_name}! Fine-tune it in the Glyph Composer. ✨"
+    files = [discord.File(io.BytesIO(clip), filename=f'{title}.ogg'), discord.File(io.BytesIO(timeline.to_nglyph()), filename=f'{title}.nglyph')]
+    if queued:
+        await ctx.edit(content=content, files=files)
+    else:
+        await ctx.respond(content=content, files=files)
 
 # when a button interaction times out remove the buttons
 @bot.event
 async def on_button_timeout(interaction: discord.Interaction):
     await interaction.message.edit(view=None)
 
+# how long a /create filebin is watched for an upload, followups to the interaction only work for 15 minutes
+UPLOAD_TIMEOUT = 14 * 60
+
 class FileBinButtons(discord.ui.View):
-    def __init__(self, url: str, bin: str, title: str, yt_url: str, begin: float, end: float, watermark: str, user: str):
+    def __init__(self, url: str, bin: str, title: str, yt_url: str, begin: float, end: float, watermark: str, user: str, ctx: discord.ApplicationContext):
         super().__init__()
         self.url = url
         self.bin = bin
@@ -209,15 +365,50 @@ class FileBinButtons(discord.ui.View):
         self.end = end
         self.watermark = watermark
         self.user = user
+        self.ctx = ctx
         user_name_parts = user.rsplit('#', 1)[0].rsplit('#', 1)[0].split('#')
         self.user_name = ''.join(user_name_parts[:-1])
         self.user_id = int(user.split('#')[-1])
         self.disable_on_timeout = True
-        self.timeout = 60
+        self.timeout = UPLOAD_TIMEOUT
         self.button_pressed = False
+        self.glyph: glyph_tools.GlyphTimeline | None = None
+        self.sync_task: asyncio.Task | None = None
         # Dynamically adding a button with a fixed URL
         self.add_item(discord.ui.Button(label="Upload here", style=discord.ButtonStyle.link, url=self.url))
 
+    def start_watching(self):
+        """
+        Have the bin watcher look for the upload in the background.
+        """
+        bin_watcher.watch(self.bin, self.on_upload, timeout=UPLOAD_TIMEOUT)
+
+    async def on_upload(self, files: list[filebin.BinFile]) -> bool:
+        """
+        Called by the bin watcher with new .nglyph and label files in the bin. Loads the first valid one and tells the user.
+        """
+        # the files arrive in memory, from one archive of the bin or concurrent downloads, and are parsed as each one lands
+        async with contextlib.aclosing(filebin.ingest(self.bin, files)) as downloads:
+            async for download in downloads:
+                if isinstance(download, filebin.IngestError):
+                    await self.ctx.followup.send(content=f"<:glyphError:1223680333820596294> {download}", ephemeral=True)
+                    continue
+                try:
+                    glyph = await asyncio.to_thread(glyph_tools.load_glyph_file, download.filename, download.data)
+                except glyph_tools.GlyphFormatError as e:
+                    await self.ctx.followup.send(content=f"<:glyphError:1223680333820596294> {download.filename} is not a valid glyph file: {e}", ephemeral=True)
+                    continue
+                self.glyph = glyph
+                await self.ctx.followup.send(content=f"<:glyphSuccess:1223680541614801007> <@{self.user_id}> found {download.filename} in your filebin: {glyph.phone_name}, {glyph.zones} zones, "
+                                                     f"{glyph.duration_ms / 1000:.1f}s. Press Confirm to use it.", ephemeral=True)
+                # the sync check needs the audio, the watcher shouldn't wait for it
+                self.sync_task = asyncio.create_task(self.check_sync())
+                return True
+        return False
+
+    async def on_timeout(self):
+        bin_watcher.unwatch(self.bin)
+        await super().on_timeout()
 
     # Static custom_id for demonstration
     @discord.ui.button(label="Confirm", style=discord.ButtonStyle.green, custom_id="confirm_bin", row=0)
@@ -228,22 +419,67 @@ class FileBinButtons(discord.ui.View):
 
         self.button_pressed = True
 
-        if await filebin.check_for_nglyph_file_in_bin(self.bin):
-            await interaction.response.send_message(content=f"<:glyphSuccess:1223680541614801007> <@{self.user_id}> your filebin ({self.bin}) upload has been confirmed.", ephemeral=True, delete_after=15)
-            await filebin.lock_filebin(self.bin)
-            button.disabled = True
-            files = await filebin.get_files_in_bin(self.bin)
-            for file in files:
-                if file.endswith('.nglyph'):
-                    filename = await filebin.download_file_from_bin(self.bin, file)
-            # copy file to new 
-            
-        else:
-            await interaction.response.send_message(content=f"<:glyphError:1223680333820596294> <@{self.user_id}> your filebin ({self.bin}) upload was not confirmed. Please try again.", ephemeral=True, delete_after=15)
+        if self.glyph is None:
+            # the upload may have finished since the last poll, look once more before giving up
+            await interaction.response.defer(ephemeral=True)
+            await bin_watcher.poll_now(self.bin)
+        if self.glyph is None:
+            await interaction.followup.send(content=f"<:glyphError:1223680333820596294> <@{self.user_id}> there is no valid .nglyph or label file in your filebin ({self.bin}) yet. "
+                                                    "You will be notified as soon as it is uploaded.", ephemeral=True, delete_after=15)
             self.button_pressed = False
+            return
+
+        content = f"<:glyphSuccess:1223680541614801007> <@{self.user_id}> your filebin ({self.bin}) upload has been confirmed."
+        if interaction.response.is_done():
+            await interaction.followup.send(content=content, ephemeral=True, delete_after=15)
+        else:
+            await interaction.response.send_message(content=content, ephemeral=True, delete_after=15)
+        bin_watcher.unwatch(self.bin)
+        await filebin.lock_filebin(self.bin)
+        button.disabled = True
 
         await filebin.delete_filebin(self.bin)
 
+    async def check_sync(self):
+        """
+        Compare the uploaded glyph with the onsets of the trimmed audio and offer to fix the offset.
+        """
+        async def audio_envelope():
+            info = await media_info.extract_info(self.yt_url)
+            clip = await audio_trim.trim(info, media_info.select_audio_format(info), self.begin, self.end)
+            return await glyph_autogen.onset_envelope(clip)
+
+        try:
+            envelope = await media_jobs.submit(audio_envelope, user_id=self.user_id, guild_id=self.ctx.guild_id)
+        except (QueueFullError, youtube_dl.DownloadError, audio_trim.TrimError, glyph_autogen.DecodeError) as e:
+            logger.warning(f"Could not check the sync of {self.bin}: {str(e)[-500:]}")
+            return
+
+        result = glyph_sync.check_sync(self.glyph, envelope)
+        if not result.should_correct:
+            await self.ctx.followup.send(content="<:glyphSuccess:1223680541614801007> Your glyph is in sync with the audio.", ephemeral=True)
+            return
+        direction = "late" if result.offset_ms < 0 else "early"
+        await self.ctx.followup.send(content=f"Your glyph seems to be {abs(result.offset_ms):.0f}ms {direction} compared to the audio.",
+                                     view=SyncFixView(self, result), ephemeral=True)
+
+class SyncFixView(discord.ui.View):
+    """
+    Offers to shift an uploaded glyph by the offset the sync check found.
+    """
+    def __init__(self, parent: FileBinButtons, result: glyph_sync.SyncResult):
+        super().__init__(timeout=120, disable_on_timeout=True)
+        self.parent = parent
+        self.result = result
+
+    @discord.ui.button(label="Fix offset", style=discord.ButtonStyle.green)
+    async def apply_button(self, button: discord.ui.Button, interaction: discord.Interaction):
+        self.parent.glyph = glyph_sync.apply_offset(self.parent.glyph, self.result.offset_ms)
+        button.disabled = True
+        nglyph = discord.File(io.BytesIO(self.parent.glyph.to_nglyph()), filename=f'{self.parent.title}.nglyph')
+        await interaction.response.edit_message(content=f"Shifted your glyph by {self.result.offset_ms:+.0f}ms.", view=self)
+        await interaction.followup.send(content="Here's the corrected glyph.", file=nglyph, ephemeral=True)
+
 
 
 
@@ -264,15 +500,35 @@ async def create(ctx: discord.ApplicationContext,
     # acknowledge the command without sending a response
     await ctx.defer(ephemeral=True) 
 
-    new_bin = await filebin.create_filebin(title=title)
-    filebin_url = f'https://filebin.net/{new_bin}'
+    if not validators.url(url):
+        await ctx.respond(content="Invalid URL provided.", ephemeral=True)
+        return
+
+    try:
+        info = await media_info.extract_info(url)
+    except youtube_dl.DownloadError:
+        await ctx.respond(content="Error extracting info from the URL.", ephemeral=True)
+        return
+
+    if end is None:
+        end = info['duration']
+    if begin < 0.0 or end < 0.0 or begin > end or end > info['duration']:
+        await ctx.respond(content="Invalid begin or end time.", ephemeral=True)
+        return
+
+    # take a bin from the warm pool, only create one while the user waits if the pool ran dry
+    new_bin = bin_pool.pop()
+    if new_bin is None:
+        new_bin = await filebin.create_filebin(title=title)
     if new_bin is None:
         await ctx.respond(content="Error creating filebin link. Please try again later.", ephemeral=True)
         return
+    filebin_url = f'https://filebin.net/{new_bin}'
 
-    view = FileBinButtons(url=filebin_url, bin=new_bin, title=title, yt_url=url, begin=begin, end=end, watermark=watermark, user=f'{ctx.author.name}#{ctx.author.id}')
+    view = FileBinButtons(url=filebin_url, bin=new_bin, title=title, yt_url=url, begin=begin, end=end, watermark=watermark, user=f'{ctx.author.name}#{ctx.author.id}', ctx=ctx)
     
     await ctx.respond(content=f"Created custom filebin: {filebin_url}", view=view, ephemeral=True)
+    view.start_watching()
 
 
 
@@ -287,15 +543,140 @@ async def upload(ctx: discord.ApplicationContext, name: str = discord.Option(nam
     await ctx.respond(content="Not done yet...")
 
 
+async def glyph_title_autocomplete(ctx: discord.AutocompleteContext):
+    """
+    Autocomplete glyph titles from the in-memory title index, without touching the database.
+    """
+    return glyphs.titles.complete(ctx.value or '', limit=25)
+
+
 @bot.slash_command(integration_types={discord.IntegrationType.guild_install, discord.IntegrationType.user_install}, name="search", description="Search our database for a custom glyph")
-async def search(ctx: discord.ApplicationContext, name: str = discord.Option(name="name", description="The name of the custom glyph", required=True)):
+async def search(ctx: discord.ApplicationContext, name: str = discord.Option(name="name", description="The name of the custom glyph", required=True, autocomplete=glyph_title_autocomplete)):
     """
     Command to search our database for a custom glyph
     """
     logger.info(f"{ctx.author} used /search command in {ctx.channel} on {ctx.guild}.")
 
-    # acknowledge the command without sending a response
-    await ctx.respond(content="Not done yet...")
+    results = await glyphs.search(name, limit=10)
+    if not results:
+        await ctx.respond(content=f"No custom glyphs found for `{name}`.", ephemeral=make_ephemeral)
+        return
+
+    # Create an embed with the best matches first
+    embed = discord.Embed(title=f"Search results for {name}")
+    for entry, score in results:
+        embed.add_field(name=f"#{entry.id} {entry.title}", value=f"by {entry.creator} for {entry.phone}\n{entry.youtube_link}", inline=False)
+    embed.set_footer(text=f"Showing the {len(results)} best matches.")
+
+    # the previews were rendered when the glyphs were added, here they are only read
+    top = [entry for entry, score in results[:4]]
+    previews = await glyphs.get_previews([entry.id for entry in top])
+    embeds, files = [embed], []
+    for entry in top:
+        if entry.id in previews:
+            preview_embed = discord.Embed(title=f"#{entry.id} {entry.title}")
+            preview_embed.set_image(url=f"attachment://preview_{entry.id}.png")
+            embeds.append(preview_embed)
+            files.append(discord.File(io.BytesIO(previews[entry.id]), filename=f"preview_{entry.id}.png"))
+
+    await ctx.respond(embeds=embeds, files=files, ephemeral=make_ephemeral)
+
+
+class BrowseView(discord.ui.View):
+    """
+    Pages through a glyph listing with keyset pagination, newest first.
+    """
+    page_size = 10
+
+    def __init__(self, user_id: int, description: str, creator_id: int | None = None, phone: str | None = None):
+        super().__init__(timeout=180, disable_on_timeout=True)
+        self.user_id = user_id
+        self.description = description
+        self.creator_id = creator_id
+        self.phone = phone
+        # the keyset cursor each visited page was fetched with, the last one is the current page
+        self.cursors: list[tuple[str, int] | None] = [None]
+        self.entries: list = []
+        self.has_next = False
+
+    async def load(self):
+        # fetch one extra row to know whether there is a next page
+        entries = await glyphs.browse(creator_id=self.creator_id, phone=self.phone, before=self.cursors[-1], limit=self.page_size + 1)
+        self.has_next = len(entries) > self.page_size
+        self.entries = entries[:self.page_size]
+        self.previous_button.disabled = len(self.cursors) == 1
+        self.next_button.disabled = not self.has_next
+
+    def embed(self) -> discord.Embed:
+        embed = discord.Embed(title="Custom glyphs", description=self.description)
+        for entry in self.entries:
+            embed.add_field(name=f"#{entry.id} {entry.title}", value=f"by {entry.creator} for {entry.phone} on {entry.timestamp}", inline=False)
+        if not self.entries:
+            embed.add_field(name="Nothing here", value="No custom glyphs match this listing yet.", inline=False)
+        embed.set_footer(text=f"Page {len(self.cursors)}")
+        return embed
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        if interaction.user.id != self.user_id:
+            await interaction.response.send_message("Use /browse to get your own listing.", ephemeral=True, delete_after=10)
+            return False
+        return True
+
+    @discord.ui.button(label="Previous", style=discord.ButtonStyle.secondary, row=0)
+    async def previous_button(self, button: discord.ui.Button, interaction: discord.Interaction):
+        if len(self.cursors) > 1:
+            self.cursors.pop()
+        await self.load()
+        await interaction.response.edit_message(embed=self.embed(), view=self)
+
+    @discord.ui.button(label="Next", style=discord.ButtonStyle.primary, row=0)
+    async def next_button(self, button: discord.ui.Button, interaction: discord.Interaction):
+        if self.has_next and self.entries:
+            last = self.entries[-1]
+            self.cursors.append((last.timestamp, last.id))
+        await self.load()
+        await interaction.response.edit_message(embed=self.embed(), view=self)
+
+
+@bot.slash_command(integration_types={discord.IntegrationType.guild_install, discord.IntegrationType.user_install}, name="browse", description="Browse the custom glyphs in our database")
+async def browse(ctx: discord.ApplicationContext,
+                 listing: str = discord.Option(name="listing", description="Which glyphs to list", choices=["newest", "mine", "phone"], default="newest"),
+                 phone: str = discord.Option(name="phone", description="The phone to list glyphs for", choices=["Phone (1)", "Phone (2)", "Phone (2a)"], default=None)):
+    """
+    Command to browse the custom glyphs in our database
+    """
+    logger.info(f"{ctx.author} used /browse command in {ctx.channel} on {ctx.guild}.")
+
+    if listing == "mine":
+        view = BrowseView(ctx.author.id, "Your custom glyphs, newest first.", creator_id=ctx.author.id, phone=phone)
+    elif listing == "phone":
+        if phone is None:
+            await ctx.respond(content="Please pick a phone to list glyphs for.", ephemeral=True)
+            return
+        view = BrowseView(ctx.author.id, f"Custom glyphs for the {phone}, newest first.", phone=phone)
+    else:
+        view = BrowseView(ctx.author.id, "The newest custom glyphs.", phone=phone)
+
+    await view.load()
+    await ctx.respond(embed=view.embed(), view=view, ephemeral=make_ephemeral)
+
+
+@bot.slash_command(integration_types={discord.IntegrationType.guild_install, discord.IntegrationType.user_install}, name="download", description="Download a custom glyph from our database")
+async def download(ctx: discord.ApplicationContext, entry_id: int = discord.Option(name="id", description="The id of the custom glyph", required=True)):
+    """
+    Command to download a custom glyph from our database
+    """
+    logger.info(f"{ctx.author} used /download command in {ctx.channel} on {ctx.guild}.")
+
+    entry = await glyphs.get_glyph(entry_id)
+    glyph_data = await glyphs.open_glyph_data(entry_id) if entry is not None else None
+    if glyph_data is None:
+        await ctx.respond(content=f"No custom glyph found with id {entry_id}.", ephemeral=True)
+        return
+
+    # the glyph data is streamed from the database straight into the upload
+    with glyph_data:
+        await ctx.respond(content=f"Here's **{entry.title}** by {entry.creator}.", file=discord.File(glyph_data, filename=f'entry_{entry_id}.zip'), ephemeral=make_ephemeral)
 
 
 # Run the bot
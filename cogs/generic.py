@@ -62,8 +62,11 @@ class GenericCog(commands.Cog):
         embed.add_field(name="/about", value="Display information about the bot.", inline=False)
         embed.add_field(name="/create", value="Create a custom glyph.", inline=False)
         embed.add_field(name="/visualize", value="Visualize a custom glyph.", inline=False)
+        embed.add_field(name="/autoglyph", value="Generate a custom glyph from the beats of a song.", inline=False)
         embed.add_field(name="/publish", value="Publish a custom glyph to our database.", inline=False)
         embed.add_field(name="/search", value="Search for a custom glyph.", inline=False)
+        embed.add_field(name="/browse", value="Browse the newest glyphs, your glyphs or the glyphs for a phone.", inline=False)
+        embed.add_field(name="/download", value="Download a custom glyph from our database.", inline=False)
         embed.add_field(name="/help", value="Display this help message.", inline=False)
 
         # Send the embed
@@ -0,0 +1,72 @@
+"""
+Compare the two ways of taking the glyph uploads out of a filebin: one tar stream of the whole bin against one download per file.
+
+    python filebin_bench.py <bin> [--rounds 5]
+
+Upload a few .nglyph/label files to a bin first. For every round and mode the bin is listed, then its glyph files are ingested;
+the script prints the number of HTTP requests (redirects included), the time to the first file and the total time.
+"""
+import argparse
+import asyncio
+import contextlib
+import statistics
+import sys
+import time
+import httpx
+from subclasses import filebin
+
+MODES = ('archive', 'files')
+
+
+async def run_round(bin: str, mode: str) -> tuple[int, float, float, int]:
+    requests = 0
+
+    async def count(request: httpx.Request):
+        nonlocal requests
+        requests += 1
+
+    # a fresh client per round so every mode pays for its own connections
+    filebin.configure_client(event_hooks={'request': [count]})
+    try:
+        start = time.perf_counter()
+        # always ask filebin, a cached listing would hide the request from the second mode
+        files = await filebin.list_files(bin, max_age=0)
+        if files is None:
+            raise SystemExit(f'Bin {bin} does not exist.')
+        files = [file for file in files if file.filename.lower().endswith(filebin.GLYPH_FILE_EXTENSIONS)]
+        first = None
+        received = 0
+        async with contextlib.aclosing(filebin.ingest(bin, files, mode=mode)) as downloads:
+            async for download in downloads:
+                if first is None:
+                    first = time.perf_counter() - start
+                if not isinstance(download, filebin.IngestError):
+                    received += 1
+        total = time.perf_counter() - start
+    finally:
+        await filebin.close_client()
+    return requests, first if first is not None else total, total, received
+
+
+async def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description='Benchmark archive against per-file ingestion of a filebin.')
+    parser.add_argument('bin')
+    parser.add_argument('--rounds', type=int, default=5, help='Rounds per mode (default: %(default)s)')
+    args = parser.parse_args(argv)
+
+    results = {mode: [] for mode in MODES}
+    for _ in range(args.rounds):
+        # alternate the modes so both see the same network conditions
+        for mode in MODES:
+            results[mode].append(await run_round(args.bin, mode))
+
+    print(f'{"mode":<8} {"files":>5} {"requests":>8} {"first file":>11} {"total":>9}')
+    for mode, rounds in results.items():
+        requests, first, total, received = zip(*rounds)
+        print(f'{mode:<8} {received[0]:>5} {statistics.median(requests):>8.0f} '
+              f'{statistics.median(first) * 1000:>9.0f}ms {statistics.median(total) * 1000:>7.0f}ms')
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -5,6 +5,7 @@ import httpx
 
 from ... import errors
 from ...client import AuthenticatedClient, Client
+from ...models.bin_details import BinDetails
 from ...types import Response
 
 
@@ -19,9 +20,11 @@ def _get_kwargs(
     return _kwargs
 
 
-def _parse_response(*, client: Union[AuthenticatedClient, Client], response: httpx.Response) -> Optional[Any]:
+def _parse_response(*, client: Union[AuthenticatedClient, Client], response: httpx.Response) -> Optional[BinDetails]:
     if response.status_code == HTTPStatus.OK:
-        return None
+        response_200 = BinDetails.from_dict(response.json())
+
+        return response_200
     if response.status_code == HTTPStatus.NOT_FOUND:
         return None
     if client.raise_on_unexpected_status:
@@ -30,7 +33,7 @@ def _parse_response(*, client: Union[AuthenticatedClient, Client], response: htt
         return None
 
 
-def _build_response(*, client: Union[AuthenticatedClient, Client], response: httpx.Response) -> Response[Any]:
+def _build_response(*, client: Union[AuthenticatedClient, Client], response: httpx.Response) -> Response[BinDetails]:
     return Response(
         status_code=HTTPStatus(response.status_code),
         content=response.content,
@@ -43,7 +46,7 @@ def sync_detailed(
     bin_: str,
     *,
     client: Union[AuthenticatedClient, Client],
-) -> Response[Any]:
+) -> Response[BinDetails]:
     """Show a bin
 
      This will show meta data about the bin such as timestamps, file sizes, file names and so on.
@@ -56,7 +59,7 @@ def sync_detailed(
         httpx.TimeoutException: If the request takes longer than Client.timeout.
 
     Returns:
-        Response[Any]
+        Response[BinDetails]
     """
 
     kwargs = _get_kwargs(
@@ -74,7 +77,7 @@ async def asyncio_detailed(
     bin_: str,
     *,
     client: Union[AuthenticatedClient, Client],
-) -> Response[Any]:
+) -> Response[BinDetails]:
     """Show a bin
 
      This will show meta data about the bin such as timestamps, file sizes, file names and so on.
@@ -87,7 +90,7 @@ async def asyncio_detailed(
         httpx.TimeoutException: If the request takes longer than Client.timeout.
 
     Returns:
-        Response[Any]
+        Response[BinDetails]
     """
 
     kwargs = _get_kwargs(
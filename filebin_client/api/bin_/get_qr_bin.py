@@ -1,11 +1,12 @@
+from contextlib import asynccontextmanager
 from http import HTTPStatus
-from typing import Any, Dict, Optional, Union
+from typing import Any, AsyncIterator, Dict, Optional, Union
 
 import httpx
 
 from ... import errors
 from ...client import AuthenticatedClient, Client
-from ...types import Response
+from ...types import Response, StreamingResponse
 
 
 def _get_kwargs(
@@ -95,3 +96,36 @@ async def asyncio_detailed(
     response = await client.get_async_httpx_client().request(**kwargs)
 
     return _build_response(client=client, response=response)
+
+
+@asynccontextmanager
+async def asyncio_stream(
+    bin_: str,
+    *,
+    client: Union[AuthenticatedClient, Client],
+    follow_redirects: bool = True,
+) -> AsyncIterator[StreamingResponse]:
+    """Generate a QR code with the absolute URL to the bin
+
+     This will generate a PNG image with a QR code that has embedded the absolute URL to the bin. This
+    makes it convenient to share the bin across mobile devices.
+
+    Args:
+        bin_ (str):
+        follow_redirects (bool): Follow redirects (files are served from the storage backend).
+
+    The body is not read: iterate it with StreamingResponse.aiter_bytes, optionally capped with max_bytes.
+
+    Raises:
+        httpx.TimeoutException: If the request takes longer than Client.timeout.
+
+    Returns:
+        StreamingResponse, valid inside the async with block
+    """
+
+    kwargs = _get_kwargs(
+        bin_=bin_,
+    )
+
+    async with client.get_async_httpx_client().stream(**kwargs, follow_redirects=follow_redirects) as response:
+        yield StreamingResponse.from_httpx(response)
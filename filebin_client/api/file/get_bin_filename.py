@@ -1,11 +1,12 @@
+from contextlib import asynccontextmanager
 from http import HTTPStatus
-from typing import Any, Dict, Optional, Union
+from typing import Any, AsyncIterator, Dict, Optional, Union
 
 import httpx
 
 from ... import errors
 from ...client import AuthenticatedClient, Client
-from ...types import Response
+from ...types import Response, StreamingResponse
 
 
 def _get_kwargs(
@@ -108,3 +109,39 @@ async def asyncio_detailed(
     response = await client.get_async_httpx_client().request(**kwargs)
 
     return _build_response(client=client, response=response)
+
+
+@asynccontextmanager
+async def asyncio_stream(
+    bin_: str,
+    filename: str,
+    *,
+    client: Union[AuthenticatedClient, Client],
+    follow_redirects: bool = True,
+) -> AsyncIterator[StreamingResponse]:
+    """Download a file from a bin
+
+     This is a regular file download, which includes content-length and checksums of the content in the
+    response headers. The content-type will be set according to the content.
+
+    Args:
+        bin_ (str):
+        filename (str):
+        follow_redirects (bool): Follow redirects (files are served from the storage backend).
+
+    The body is not read: iterate it with StreamingResponse.aiter_bytes, optionally capped with max_bytes.
+
+    Raises:
+        httpx.TimeoutException: If the request takes longer than Client.timeout.
+
+    Returns:
+        StreamingResponse, valid inside the async with block
+    """
+
+    kwargs = _get_kwargs(
+        bin_=bin_,
+        filename=filename,
+    )
+
+    async with client.get_async_httpx_client().stream(**kwargs, follow_redirects=follow_redirects) as response:
+        yield StreamingResponse.from_httpx(response)
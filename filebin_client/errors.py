@@ -1,5 +1,7 @@
 """Contains shared errors types that can be raised from API functions"""
 
+from typing import Optional
+
 
 class UnexpectedStatus(Exception):
     """Raised by api functions when the response status an undocumented status and Client.raise_on_unexpected_status is True"""
@@ -13,4 +15,17 @@ class UnexpectedStatus(Exception):
         )
 
 
-__all__ = ["UnexpectedStatus"]
+class ResponseTooLarge(Exception):
+    """Raised by streaming api functions when the body is larger than the caller allowed"""
+
+    def __init__(self, max_bytes: int, content_length: Optional[int] = None):
+        self.max_bytes = max_bytes
+        self.content_length = content_length
+
+        if content_length is not None:
+            super().__init__(f"Response body is {content_length} bytes, the limit is {max_bytes} bytes")
+        else:
+            super().__init__(f"Response body is larger than the limit of {max_bytes} bytes")
+
+
+__all__ = ["UnexpectedStatus", "ResponseTooLarge"]
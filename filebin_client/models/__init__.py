@@ -1 +1,11 @@
 """Contains all the data models used in inputs/outputs"""
+
+from .bin_ import Bin
+from .bin_details import BinDetails
+from .bin_file import BinFile
+
+__all__ = (
+    "Bin",
+    "BinDetails",
+    "BinFile",
+)
@@ -0,0 +1,60 @@
+from typing import Any, Dict, Type, TypeVar, Union
+
+from attrs import define as _attrs_define
+
+from ..types import UNSET, Unset
+
+T = TypeVar("T", bound="Bin")
+
+
+@_attrs_define
+class Bin:
+    """
+    Attributes:
+        id (str):
+        readonly (Union[Unset, bool]):
+        bytes_ (Union[Unset, int]):
+        files (Union[Unset, int]):
+        updated_at (Union[Unset, str]):
+        created_at (Union[Unset, str]):
+        expired_at (Union[Unset, str]):
+    """
+
+    id: str
+    readonly: Union[Unset, bool] = UNSET
+    bytes_: Union[Unset, int] = UNSET
+    files: Union[Unset, int] = UNSET
+    updated_at: Union[Unset, str] = UNSET
+    created_at: Union[Unset, str] = UNSET
+    expired_at: Union[Unset, str] = UNSET
+
+    def to_dict(self) -> Dict[str, Any]:
+        field_dict: Dict[str, Any] = {
+            "id": self.id,
+        }
+        if not isinstance(self.readonly, Unset):
+            field_dict["readonly"] = self.readonly
+        if not isinstance(self.bytes_, Unset):
+            field_dict["bytes"] = self.bytes_
+        if not isinstance(self.files, Unset):
+            field_dict["files"] = self.files
+        if not isinstance(self.updated_at, Unset):
+            field_dict["updated_at"] = self.updated_at
+        if not isinstance(self.created_at, Unset):
+            field_dict["created_at"] = self.created_at
+        if not isinstance(self.expired_at, Unset):
+            field_dict["expired_at"] = self.expired_at
+
+        return field_dict
+
+    @classmethod
+    def from_dict(cls: Type[T], src_dict: Dict[str, Any]) -> T:
+        return cls(
+            id=src_dict["id"],
+            readonly=src_dict.get("readonly", UNSET),
+            bytes_=src_dict.get("bytes", UNSET),
+            files=src_dict.get("files", UNSET),
+            updated_at=src_dict.get("updated_at", UNSET),
+            created_at=src_dict.get("created_at", UNSET),
+            expired_at=src_dict.get("expired_at", UNSET),
+        )
@@ -0,0 +1,41 @@
+from typing import TYPE_CHECKING, Any, Dict, List, Type, TypeVar
+
+from attrs import define as _attrs_define
+from attrs import field as _attrs_field
+
+if TYPE_CHECKING:
+    from ..models.bin_ import Bin
+    from ..models.bin_file import BinFile
+
+
+T = TypeVar("T", bound="BinDetails")
+
+
+@_attrs_define
+class BinDetails:
+    """The meta data of a bin and of the files in it
+
+    Attributes:
+        bin_ (Bin):
+        files (List['BinFile']):
+    """
+
+    bin_: "Bin"
+    files: List["BinFile"] = _attrs_field(factory=list)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "bin": self.bin_.to_dict(),
+            "files": [files_item.to_dict() for files_item in self.files],
+        }
+
+    @classmethod
+    def from_dict(cls: Type[T], src_dict: Dict[str, Any]) -> T:
+        from ..models.bin_ import Bin
+        from ..models.bin_file import BinFile
+
+        return cls(
+            bin_=Bin.from_dict(src_dict["bin"]),
+            # filebin sends null instead of an empty list for a bin without files
+            files=[BinFile.from_dict(files_item) for files_item in src_dict.get("files") or []],
+        )
@@ -0,0 +1,60 @@
+from typing import Any, Dict, Type, TypeVar, Union
+
+from attrs import define as _attrs_define
+
+from ..types import UNSET, Unset
+
+T = TypeVar("T", bound="BinFile")
+
+
+@_attrs_define
+class BinFile:
+    """
+    Attributes:
+        filename (str):
+        content_type (Union[Unset, str]):
+        bytes_ (Union[Unset, int]):
+        md5 (Union[Unset, str]):
+        sha256 (Union[Unset, str]):
+        updated_at (Union[Unset, str]):
+        created_at (Union[Unset, str]):
+    """
+
+    filename: str
+    content_type: Union[Unset, str] = UNSET
+    bytes_: Union[Unset, int] = UNSET
+    md5: Union[Unset, str] = UNSET
+    sha256: Union[Unset, str] = UNSET
+    updated_at: Union[Unset, str] = UNSET
+    created_at: Union[Unset, str] = UNSET
+
+    def to_dict(self) -> Dict[str, Any]:
+        field_dict: Dict[str, Any] = {
+            "filename": self.filename,
+        }
+        if not isinstance(self.content_type, Unset):
+            field_dict["content-type"] = self.content_type
+        if not isinstance(self.bytes_, Unset):
+            field_dict["bytes"] = self.bytes_
+        if not isinstance(self.md5, Unset):
+            field_dict["md5"] = self.md5
+        if not isinstance(self.sha256, Unset):
+            field_dict["sha256"] = self.sha256
+        if not isinstance(self.updated_at, Unset):
+            field_dict["updated_at"] = self.updated_at
+        if not isinstance(self.created_at, Unset):
+            field_dict["created_at"] = self.created_at
+
+        return field_dict
+
+    @classmethod
+    def from_dict(cls: Type[T], src_dict: Dict[str, Any]) -> T:
+        return cls(
+            filename=src_dict["filename"],
+            content_type=src_dict.get("content-type", UNSET),
+            bytes_=src_dict.get("bytes", UNSET),
+            md5=src_dict.get("md5", UNSET),
+            sha256=src_dict.get("sha256", UNSET),
+            updated_at=src_dict.get("updated_at", UNSET),
+            created_at=src_dict.get("created_at", UNSET),
+        )
@@ -1,10 +1,13 @@
 """Contains some shared types for properties"""
 
 from http import HTTPStatus
-from typing import BinaryIO, Generic, Literal, MutableMapping, Optional, Tuple, TypeVar
+from typing import AsyncIterator, BinaryIO, Generic, Literal, MutableMapping, Optional, Tuple, TypeVar
 
+import httpx
 from attrs import define
 
+from .errors import ResponseTooLarge
+
 
 class Unset:
     def __bool__(self) -> Literal[False]:
@@ -42,4 +45,37 @@ class Response(Generic[T]):
     parsed: Optional[T]
 
 
-__all__ = ["File", "Response", "FileJsonType", "Unset", "UNSET"]
+@define
+class StreamingResponse:
+    """A response from an endpoint whose body has not been read yet"""
+
+    status_code: HTTPStatus
+    headers: MutableMapping[str, str]
+    _response: httpx.Response
+
+    @classmethod
+    def from_httpx(cls, response: httpx.Response) -> "StreamingResponse":
+        return cls(status_code=HTTPStatus(response.status_code), headers=response.headers, response=response)
+
+    async def aiter_bytes(self, max_bytes: Optional[int] = None, chunk_size: Optional[int] = None) -> AsyncIterator[bytes]:
+        """Iterate over the body as it arrives.
+
+        Raises:
+            errors.ResponseTooLarge: Before reading if Content-Length is over max_bytes, or as soon as more than max_bytes arrived.
+        """
+        length = self.headers.get("content-length")
+        if max_bytes is not None and length is not None and int(length) > max_bytes:
+            raise ResponseTooLarge(max_bytes, int(length))
+        received = 0
+        async for chunk in self._response.aiter_bytes(chunk_size):
+            received += len(chunk)
+            if max_bytes is not None and received > max_bytes:
+                raise ResponseTooLarge(max_bytes)
+            yield chunk
+
+    async def aread(self, max_bytes: Optional[int] = None) -> bytes:
+        """Read the whole body, at most max_bytes of it (see aiter_bytes)"""
+        return b"".join([chunk async for chunk in self.aiter_bytes(max_bytes)])
+
+
+__all__ = ["File", "Response", "StreamingResponse", "FileJsonType", "Unset", "UNSET"]
@@ -0,0 +1,364 @@
+"""
+Bulk import and export for the custom glyph database.
+
+    python glyph_bulk.py import <directory or manifest.jsonl> [--phone "Phone (2)"] [--creator Name --creator-id 123]
+    python glyph_bulk.py export <directory>
+    python glyph_bulk.py backfill-previews
+    python glyph_bulk.py backfill-timelines
+    python glyph_bulk.py benchmark-codec [--limit 500]
+
+A manifest is a JSONL file with one glyph per line:
+    {"title": ..., "youtube_link": ..., "timestamp": ..., "phone": ..., "creator": ..., "creator_id": ..., "file": "relative/path.zip"}
+Export writes the same format, so an export can be imported into another database.
+"""
+import argparse
+import datetime
+import io
+import json
+import sqlite3
+import sys
+import time
+import zipfile
+from pathlib import Path
+from typing import Callable, Iterator
+from subclasses import glyph_codec
+from subclasses.glyph_tools import GlyphFormatError, GlyphTimeline
+from subclasses.glyph_db import DB_PATH, BLOB_CHUNK_SIZE, derive_timeline_data, glyph_data_hash, migrate
+from subclasses.glyph_preview import preview_from_archive, timeline_from_archive
+
+GLYPH_EXTENSIONS = ('.nglyph', '.zip')
+MANIFEST_REQUIRED_KEYS = ('title', 'file')
+
+
+def iter_directory(directory: Path, defaults: dict) -> Iterator[dict]:
+    """
+    Yield an entry for every .nglyph/.zip file below directory, titled after the file name.
+    """
+    for path in sorted(directory.rglob('*')):
+        if path.is_file() and path.suffix.lower() in GLYPH_EXTENSIONS:
+            yield {**defaults, 'title': path.stem, 'file': path}
+
+
+def iter_manifest(manifest: Path, defaults: dict) -> Iterator[dict]:
+    """
+    Yield the entries of a JSONL manifest, file paths are relative to the manifest.
+    """
+    with open(manifest, 'r', encoding='utf-8') as f:
+        for line_number, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError as e:
+                print(f'Skipping line {line_number} of {manifest}: {e}')
+                continue
+            if not isinstance(entry, dict):
+                print(f'Skipping line {line_number} of {manifest}: not a JSON object')
+                continue
+            entry = {**defaults, **entry}
+            missing = [key for key in MANIFEST_REQUIRED_KEYS if not entry.get(key)]
+            if missing:
+                print(f'Skipping line {line_number} of {manifest}: missing {", ".join(missing)}')
+                continue
+            entry['file'] = manifest.parent / entry['file']
+            yield entry
+
+
+def read_glyph_data(path: Path) -> bytes:
+    """
+    Read a glyph file as it is stored in the database: zips as they are, .nglyph files zipped up.
+    """
+    data = path.read_bytes()
+    if path.suffix.lower() == '.zip':
+        return data
+    buffer = io.BytesIO()
+    # fixed timestamp so the same file always zips to the same bytes and is deduplicated by hash
+    info = zipfile.ZipInfo(path.name, date_time=(1980, 1, 1, 0, 0, 0))
+    info.compress_type = zipfile.ZIP_DEFLATED
+    with zipfile.ZipFile(buffer, 'w') as archive:
+        archive.writestr(info, data)
+    return buffer.getvalue()
+
+
+def check_glyph_data(data: bytes) -> GlyphTimeline:
+    """
+    Parse the glyph in data as read by read_glyph_data. Raises GlyphFormatError if it is not a zip with a usable glyph in it.
+    """
+    if not zipfile.is_zipfile(io.BytesIO(data)):
+        raise GlyphFormatError('not a zip archive')
+    timeline = timeline_from_archive(data)
+    if timeline is None:
+        raise GlyphFormatError('no valid .nglyph or label file in the archive')
+    return timeline
+
+
+def _deferred_objects(conn: sqlite3.Connection) -> list[tuple[str, str]]:
+    # triggers and secondary indexes on the glyph tables, the unique hash index is kept for deduplication
+    return conn.execute(
+        "SELECT name, sql FROM sqlite_master WHERE type IN ('trigger', 'index') AND sql IS NOT NULL "
+        "AND tbl_name IN ('Custom_Glyphs', 'Glyph_Blobs')"
+    ).fetchall()
+
+
+def import_entries(conn: sqlite3.Connection, entries: Iterator[dict], batch_size: int, transaction_size: int, previews: bool = True) -> int:
+    """
+    Insert entries with executemany in large transactions, with triggers and indexes rebuilt at the end.
+    """
+    deferred = _deferred_objects(conn)
+    for name, sql in deferred:
+        kind = 'TRIGGER' if sql.lstrip().upper().startswith('CREATE TRIGGER') else 'INDEX'
+        conn.execute(f'DROP {kind} "{name}"')
+
+    blob_sql = 'INSERT INTO Glyph_Blobs (Hash, Size, Data) VALUES (?, ?, ?) ON CONFLICT(Hash) DO NOTHING'
+    glyph_sql = (
+        'INSERT INTO Custom_Glyphs (id, Title, Youtube_Link, Timestamp, Phone, Creator, Creator_ID, Blob_ID) '
+        'VALUES (?, ?, ?, ?, ?, ?, ?, (SELECT id FROM Glyph_Blobs WHERE Hash=?))'
+    )
+    preview_sql = 'INSERT INTO Glyph_Previews (Glyph_ID, Png) VALUES (?, ?)'
+    timeline_sql = 'INSERT INTO Glyph_Timelines (Glyph_ID, Data) VALUES (?, ?)'
+
+    start = time.perf_counter()
+    total = 0
+    in_transaction = 0
+    blobs, rows, row_derived = [], [], []
+
+    def flush():
+        nonlocal total, in_transaction
+        conn.executemany(blob_sql, blobs)
+        # executemany doesn't return ids, so the batch gets the next id range up front; this transaction is the only writer
+        first_id = conn.execute('SELECT COALESCE(MAX(id), 0) + 1 FROM Custom_Glyphs').fetchone()[0]
+        ids = range(first_id, first_id + len(rows))
+        conn.executemany(glyph_sql, [(entry_id, *row) for entry_id, row in zip(ids, rows)])
+        derived = [(entry_id, preview, timeline) for entry_id, (preview, timeline) in zip(ids, row_derived) if preview is not None]
+        conn.executemany(preview_sql, [(entry_id, preview) for entry_id, preview, _ in derived])
+        conn.executemany(timeline_sql, [(entry_id, timeline) for entry_id, _, timeline in derived])
+        total += len(rows)
+        in_transaction += len(rows)
+        blobs.clear()
+        rows.clear()
+        row_derived.clear()
+        if in_transaction >= transaction_size:
+            conn.execute('COMMIT')
+            conn.execute('BEGIN')
+            in_transaction = 0
+            elapsed = time.perf_counter() - start
+            print(f'{total} glyphs imported ({total / elapsed:.0f} rows/sec)')
+
+    conn.execute('BEGIN')
+    try:
+        for entry in entries:
+            try:
+                data = read_glyph_data(Path(entry['file']))
+                timeline = check_glyph_data(data)
+            except (OSError, GlyphFormatError) as e:
+                print(f"Skipping {entry['file']}: {e}")
+                continue
+            blob_hash = glyph_data_hash(data)
+            blobs.append((blob_hash, len(data), data))
+            rows.append((entry['title'], entry.get('youtube_link'), entry.get('timestamp'), entry.get('phone'),
+                         entry.get('creator'), entry.get('creator_id'), blob_hash))
+            row_derived.append(derive_timeline_data(timeline) if previews else (None, None))
+            if len(rows) >= batch_size:
+                flush()
+        flush()
+        conn.execute('COMMIT')
+    except BaseException:
+        conn.execute('ROLLBACK')
+        raise
+    finally:
+        # recreate what was dropped even if the import failed, the database must stay consistent
+        print('Rebuilding indexes and triggers...')
+        conn.execute('BEGIN')
+        for name, sql in deferred:
+            conn.execute(sql)
+        conn.execute("INSERT INTO Custom_Glyphs_Search (Custom_Glyphs_Search) VALUES ('rebuild')")
+        conn.execute('COMMIT')
+
+    elapsed = time.perf_counter() - start
+    print(f'Imported {total} glyphs in {elapsed:.1f}s ({total / elapsed if elapsed else 0:.0f} rows/sec)')
+    return total
+
+
+def backfill(conn: sqlite3.Connection, table: str, column: str, derive: Callable[[bytes], bytes | None], batch_size: int) -> int:
+    """
+    Fill table (keyed by Glyph_ID) with derive(glyph data) for every glyph that has no row in it yet.
+    """
+    start = time.perf_counter()
+    total = 0
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            f'SELECT g.id, g.Blob_ID FROM Custom_Glyphs g LEFT JOIN {table} d ON d.Glyph_ID = g.id '
+            'WHERE g.id > ? AND d.Glyph_ID IS NULL AND g.Blob_ID IS NOT NULL ORDER BY g.id LIMIT ?',
+            (last_id, batch_size),
+        ).fetchall()
+        if not rows:
+            break
+        values = []
+        for entry_id, blob_id in rows:
+            data = conn.execute('SELECT Data FROM Glyph_Blobs WHERE id=?', (blob_id,)).fetchone()[0]
+            value = derive(data)
+            if value is not None:
+                values.append((entry_id, value))
+        conn.execute('BEGIN')
+        conn.executemany(f'INSERT INTO {table} (Glyph_ID, {column}) VALUES (?, ?)', values)
+        conn.execute('COMMIT')
+        total += len(values)
+        last_id = rows[-1][0]
+
+    elapsed = time.perf_counter() - start
+    print(f'Filled {total} rows of {table} in {elapsed:.1f}s')
+    return total
+
+
+def _encode_archive(data: bytes) -> bytes | None:
+    timeline = timeline_from_archive(data)
+    return glyph_codec.encode(timeline) if timeline is not None else None
+
+
+def benchmark_codec(conn: sqlite3.Connection, limit: int, window_ms: float) -> None:
+    """
+    Compare the stored zips with the chunked timeline format: total size, full decode time and window decode time.
+    """
+    zip_bytes = codec_bytes = 0
+    zip_seconds = codec_seconds = window_seconds = 0.0
+    count = 0
+    rows = conn.execute('SELECT b.Data FROM Custom_Glyphs g JOIN Glyph_Blobs b ON b.id = g.Blob_ID ORDER BY g.id LIMIT ?', (limit,))
+    for (data,) in rows:
+        start = time.perf_counter()
+        timeline = timeline_from_archive(data)
+        zip_seconds += time.perf_counter() - start
+        if timeline is None:
+            continue
+        encoded = glyph_codec.encode(timeline)
+
+        start = time.perf_counter()
+        glyph_codec.decode(encoded)
+        codec_seconds += time.perf_counter() - start
+
+        # a window in the middle of the glyph, what a preview or the sync check of one part would read
+        middle = max(0.0, timeline.duration_ms / 2 - window_ms / 2)
+        start = time.perf_counter()
+        glyph_codec.GlyphChunkReader(io.BytesIO(encoded)).read_window(middle, middle + window_ms)
+        window_seconds += time.perf_counter() - start
+
+        zip_bytes += len(data)
+        codec_bytes += len(encoded)
+        count += 1
+
+    if count == 0:
+        print('No glyphs with a usable timeline to benchmark.')
+        return
+    print(f'{count} glyphs')
+    print(f'size:          zip {zip_bytes / 1024:.0f} KiB, chunked {codec_bytes / 1024:.0f} KiB ({zip_bytes / codec_bytes:.1f}x smaller)')
+    print(f'full decode:   zip + parse {zip_seconds / count * 1000:.2f} ms, chunked {codec_seconds / count * 1000:.2f} ms per glyph')
+    print(f'{window_ms / 1000:g}s window:    chunked {window_seconds / count * 1000:.3f} ms per glyph')
+
+
+def export_entries(conn: sqlite3.Connection, directory: Path) -> int:
+    """
+    Write every glyph to directory/files/<hash>.zip and a manifest.jsonl, one row at a time.
+    """
+    files = directory / 'files'
+    files.mkdir(parents=True, exist_ok=True)
+    start = time.perf_counter()
+    total = 0
+
+    rows = conn.execute(
+        'SELECT g.Title, g.Youtube_Link, g.Timestamp, g.Phone, g.Creator, g.Creator_ID, b.id, b.Hash '
+        'FROM Custom_Glyphs g JOIN Glyph_Blobs b ON b.id = g.Blob_ID ORDER BY g.id'
+    )
+    with open(directory / 'manifest.jsonl', 'w', encoding='utf-8') as manifest:
+        for title, youtube_link, timestamp, phone, creator, creator_id, blob_id, blob_hash in rows:
+            path = files / f'{blob_hash}.zip'
+            if not path.exists():
+                # copy the blob in chunks so large glyphs are never fully loaded
+                with conn.blobopen('Glyph_Blobs', 'Data', blob_id, readonly=True) as blob, open(path, 'wb') as f:
+                    while chunk := blob.read(BLOB_CHUNK_SIZE):
+                        f.write(chunk)
+            manifest.write(json.dumps({
+                'title': title,
+                'youtube_link': youtube_link,
+                'timestamp': timestamp,
+                'phone': phone,
+                'creator': creator,
+                'creator_id': creator_id,
+                'file': f'files/{blob_hash}.zip',
+            }) + '\n')
+            total += 1
+
+    elapsed = time.perf_counter() - start
+    print(f'Exported {total} glyphs to {directory} in {elapsed:.1f}s ({total / elapsed if elapsed else 0:.0f} rows/sec)')
+    return total
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description='Bulk import and export for the custom glyph database.')
+    parser.add_argument('--db', default=DB_PATH, help='Path to the database (default: %(default)s)')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    import_parser = commands.add_parser('import', help='Import a directory of .nglyph/.zip files or a JSONL manifest')
+    import_parser.add_argument('source', type=Path)
+    import_parser.add_argument('--phone', default=None, help='Phone for entries that don\'t specify one')
+    import_parser.add_argument('--creator', default=None, help='Creator for entries that don\'t specify one')
+    import_parser.add_argument('--creator-id', type=int, default=None, help='Creator ID for entries that don\'t specify one')
+    import_parser.add_argument('--youtube-link', default=None, help='Youtube link for entries that don\'t specify one')
+    import_parser.add_argument('--batch-size', type=int, default=1000, help='Rows per executemany (default: %(default)s)')
+    import_parser.add_argument('--transaction-size', type=int, default=50000, help='Rows per transaction (default: %(default)s)')
+
+    import_parser.add_argument('--no-previews', action='store_true', help='Skip rendering the search previews and timelines (run backfill-previews and backfill-timelines later)')
+
+    backfill_parser = commands.add_parser('backfill-previews', help='Render the search previews of glyphs that have none')
+    backfill_parser.add_argument('--batch-size', type=int, default=500, help='Glyphs per transaction (default: %(default)s)')
+
+    timelines_parser = commands.add_parser('backfill-timelines', help='Store the chunked timelines of glyphs that have none')
+    timelines_parser.add_argument('--batch-size', type=int, default=500, help='Glyphs per transaction (default: %(default)s)')
+
+    benchmark_parser = commands.add_parser('benchmark-codec', help='Compare the stored zips with the chunked timeline format')
+    benchmark_parser.add_argument('--limit', type=int, default=500, help='Number of glyphs to benchmark (default: %(default)s)')
+    benchmark_parser.add_argument('--window', type=float, default=5000, help='Window to decode in ms (default: %(default)s)')
+
+    export_parser = commands.add_parser('export', help='Export all glyphs to a directory with a JSONL manifest')
+    export_parser.add_argument('destination', type=Path)
+
+    args = parser.parse_args(argv)
+
+    conn = sqlite3.connect(args.db, isolation_level=None)
+    conn.execute('PRAGMA journal_mode=WAL')
+    migrate(conn)
+
+    try:
+        if args.command == 'import':
+            # durability of the individual transactions doesn't matter here, a failed import is simply rerun
+            conn.execute('PRAGMA synchronous=OFF')
+            conn.execute('PRAGMA cache_size=-262144')
+            defaults = {
+                'youtube_link': args.youtube_link,
+                'timestamp': datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                'phone': args.phone,
+                'creator': args.creator,
+                'creator_id': args.creator_id,
+            }
+            if args.source.is_dir():
+                entries = iter_directory(args.source, defaults)
+            elif args.source.suffix.lower() == '.jsonl':
+                entries = iter_manifest(args.source, defaults)
+            else:
+                print(f'{args.source} is neither a directory nor a .jsonl manifest.')
+                return 1
+            import_entries(conn, entries, args.batch_size, args.transaction_size, previews=not args.no_previews)
+        elif args.command == 'backfill-previews':
+            backfill(conn, 'Glyph_Previews', 'Png', preview_from_archive, args.batch_size)
+        elif args.command == 'backfill-timelines':
+            backfill(conn, 'Glyph_Timelines', 'Data', _encode_archive, args.batch_size)
+        elif args.command == 'benchmark-codec':
+            benchmark_codec(conn, args.limit, args.window)
+        else:
+            export_entries(conn, args.destination)
+    finally:
+        conn.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
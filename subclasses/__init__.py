@@ -1,3 +1,14 @@
 from .filebin import *
 from .glyph_tools import *
 from .glyph_db import *
+from .media_info import *
+from .source_cache import *
+from .audio_trim import *
+from .job_scheduler import *
+from .title_index import *
+from .lru_cache import *
+from .glyph_visualizer import *
+from .glyph_autogen import *
+from .glyph_sync import *
+from .bin_watcher import *
+from .bin_pool import *
@@ -0,0 +1,97 @@
+if __name__ == "__main__":
+    print("This is a subclass. Please use the main bot.py file.")
+    exit()
+
+import asyncio
+import os
+from .source_cache import source_cache
+
+# Trim straight from the remote media URL when the extractor gives us one ffmpeg can seek in
+STREAMING = os.getenv('TRIM_STREAMING', '1') != '0'
+SEEKABLE_PROTOCOLS = {'http', 'https'}
+HTTP_PREFIXES = ('http://', 'https://')
+
+
+class TrimError(Exception):
+    """
+    Raised when ffmpeg fails to trim the audio.
+    """
+    def __init__(self, stderr: str):
+        self.stderr = stderr
+        super().__init__(stderr)
+
+
+def stream_url(audio_format: dict) -> str | None:
+    """
+    Get the direct media URL of a format if ffmpeg can seek in it with range requests, otherwise None.
+    """
+    if audio_format.get('protocol') not in SEEKABLE_PROTOCOLS:
+        return None
+    if audio_format.get('fragments') or not audio_format.get('url'):
+        return None
+    return audio_format['url']
+
+
+def _input_args(source: str, begin: float, headers: dict | None = None) -> list[str]:
+    # -ss before -i makes ffmpeg seek in the input instead of decoding everything up to begin,
+    # for http inputs that turns into a range request at the right byte offset
+    args = ['-ss', str(begin)]
+    if headers:
+        args += ['-headers', ''.join(f'{key}: {value}\r\n' for key, value in headers.items())]
+    if source.startswith(HTTP_PREFIXES):
+        args += ['-reconnect', '1', '-reconnect_streamed', '1']
+    return args + ['-i', source]
+
+
+def _codec_args(audio_format: dict) -> list[str]:
+    # opus sources only need to be cut, everything else is encoded exactly once
+    if audio_format.get('acodec') == 'opus':
+        return ['-c:a', 'copy']
+    return ['-c:a', 'libopus', '-b:a', '189k']
+
+
+async def _run_ffmpeg(input_args: list[str], duration: float, codec_args: list[str]) -> bytes:
+    # write the ogg to stdout so the clip never touches the disk
+    ffmpeg_cmd = ['ffmpeg', '-nostdin', *input_args, '-t', str(duration), '-vn', '-map_metadata', '-1', *codec_args, '-f', 'ogg', 'pipe:1']
+    process = await asyncio.create_subprocess_exec(*ffmpeg_cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE)
+    try:
+        stdout, stderr = await process.communicate()
+    except asyncio.CancelledError:
+        # the job was cancelled or timed out, don't leave ffmpeg running
+        process.kill()
+        await process.wait()
+        raise
+
+    if process.returncode != 0:
+        raise TrimError(stderr.decode(errors='ignore'))
+    return stdout
+
+
+async def trim(info: dict, audio_format: dict, begin: float, end: float) -> bytes:
+    """
+    Cut begin..end out of a video's audio and return it as an ogg/opus file in memory.
+
+    Uses the cached source if there is one, then tries reading only the needed range from the remote stream,
+    and falls back to downloading the whole source into the cache.
+    Raises youtube_dl.DownloadError if the download fails and TrimError if ffmpeg fails.
+    """
+    duration = end - begin
+    codec_args = _codec_args(audio_format)
+
+    source = await source_cache.acquire(info, audio_format)
+    if source is None and STREAMING:
+        url = stream_url(audio_format)
+        if url is not None:
+            try:
+                data = await _run_ffmpeg(_input_args(url, begin, audio_format.get('http_headers')), duration, codec_args)
+                print(f"Trimmed {info.get('id')} from the remote stream")
+                return data
+            except TrimError as e:
+                print(f"Streaming trim of {info.get('id')} failed, downloading the source instead: {e.stderr[-500:]}")
+
+    if source is None:
+        source = await source_cache.fetch(info, audio_format)
+    try:
+        return await _run_ffmpeg(_input_args(str(source), begin), duration, codec_args)
+    finally:
+        source_cache.release(source)
@@ -0,0 +1,137 @@
+if __name__ == "__main__":
+    print("This is a subclass. Please use the main bot.py file.")
+    exit()
+
+# Keeps a few filebin bins created ahead of time so /create can hand one out without waiting on filebin.
+# Bins are handed out oldest first and a bin that has been waiting longer than MAX_AGE is deleted and replaced,
+# well before filebin's own retention would delete it under a user.
+
+import asyncio
+import os
+import time
+from collections import deque
+from . import filebin
+
+POOL_SIZE = int(os.getenv('BIN_POOL_SIZE', 8))
+# filebin deletes bins after 6 days, pooled bins are replaced long before that
+FILEBIN_RETENTION = 6 * 24 * 60 * 60
+MAX_AGE = min(float(os.getenv('BIN_POOL_MAX_AGE', 24 * 60 * 60)), FILEBIN_RETENTION / 2)
+REFILL_CONCURRENCY = 2
+RETRY_DELAY = 5.0
+MAX_RETRY_DELAY = 300.0
+
+
+class BinPool:
+    """
+    Pool of ready filebin bins, refilled to its target size in the background.
+    """
+    def __init__(self, size: int = POOL_SIZE, max_age: float = MAX_AGE):
+        self.size = size
+        self.max_age = max_age
+        # (bin, created at), oldest on the left
+        self._bins: deque[tuple[str, float]] = deque()
+        # expired bins taken off the pool by pop, deleted by the refill loop
+        self._stale: list[str] = []
+        self._creating = 0
+        self._wakeup = asyncio.Event()
+        self._runner: asyncio.Task | None = None
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+
+    def start(self):
+        """
+        Start filling the pool. Called once when the bot starts.
+        """
+        if self._runner is None:
+            self._runner = asyncio.create_task(self._run())
+            print(f'Started filebin pool of {self.size} bins')
+
+    async def stop(self):
+        """
+        Stop refilling and delete the bins nobody got, they would be lost with the pool anyway.
+        """
+        if self._runner is None:
+            return
+        self._runner.cancel()
+        await asyncio.gather(self._runner, return_exceptions=True)
+        self._runner = None
+        bins = [bin for bin, _ in self._bins] + self._stale
+        self._bins.clear()
+        self._stale = []
+        await asyncio.gather(*(filebin.delete_filebin(bin) for bin in bins), return_exceptions=True)
+        print(f'Stopped filebin pool, deleted {len(bins)} unused bins')
+
+    def pop(self) -> str | None:
+        """
+        Take a ready bin, or None if the pool is empty. Never makes a request.
+        """
+        now = time.monotonic()
+        while self._bins:
+            bin, created = self._bins.popleft()
+            if now - created < self.max_age:
+                self.hits += 1
+                self._wakeup.set()
+                return bin
+            # skip expired bins, the refill loop deletes them
+            self._stale.append(bin)
+            self.expired += 1
+        self.misses += 1
+        self._wakeup.set()
+        return None
+
+    def stats(self) -> dict:
+        """
+        Get the fill level and the hit/miss counters of the pool.
+        """
+        return {'ready': len(self._bins), 'creating': self._creating, 'size': self.size, 'hits': self.hits, 'misses': self.misses, 'expired': self.expired}
+
+    async def _expire(self):
+        now = time.monotonic()
+        expired = []
+        while self._bins and now - self._bins[0][1] >= self.max_age:
+            expired.append(self._bins.popleft()[0])
+        self.expired += len(expired)
+        expired += self._stale
+        self._stale = []
+        if expired:
+            await asyncio.gather(*(filebin.delete_filebin(bin) for bin in expired), return_exceptions=True)
+
+    async def _create(self) -> bool:
+        self._creating += 1
+        try:
+            bin = await filebin.create_filebin()
+        except Exception as e:
+            print(f'Failed to create a pooled bin: {e}')
+            return False
+        finally:
+            self._creating -= 1
+        if bin is None:
+            return False
+        self._bins.append((bin, time.monotonic()))
+        return True
+
+    async def _run(self):
+        retry_delay = RETRY_DELAY
+        while True:
+            self._wakeup.clear()
+            await self._expire()
+            missing = self.size - len(self._bins)
+            if missing > 0:
+                results = await asyncio.gather(*(self._create() for _ in range(min(missing, REFILL_CONCURRENCY))))
+                if all(results):
+                    retry_delay = RETRY_DELAY
+                    continue
+                # filebin is having trouble, don't hammer it
+                await asyncio.sleep(retry_delay)
+                retry_delay = min(retry_delay * 2, MAX_RETRY_DELAY)
+                continue
+            # sleep until a bin is taken or the oldest one expires
+            timeout = self.max_age - (time.monotonic() - self._bins[0][1]) if self._bins else None
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+
+bin_pool = BinPool()
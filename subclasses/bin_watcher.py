@@ -0,0 +1,200 @@
+if __name__ == "__main__":
+    print("This is a subclass. Please use the main bot.py file.")
+    exit()
+
+# Watches the filebins of pending /create uploads in the background.
+# Every bin has its own next poll time in one heap, so polls are spread out instead of bursting every tick.
+# The interval of a bin backs off exponentially while nothing changes and resets when something is uploaded,
+# every delay is jittered, and a global rate limit caps the requests to filebin however many bins are watched.
+
+import asyncio
+import heapq
+import itertools
+import os
+import random
+from typing import Awaitable, Callable
+from filebin_client.models import BinFile
+from . import filebin
+
+INITIAL_INTERVAL = float(os.getenv('BIN_WATCH_INITIAL_INTERVAL', 2.0))
+MAX_INTERVAL = float(os.getenv('BIN_WATCH_MAX_INTERVAL', 60.0))
+BACKOFF = 1.6
+MAX_CONCURRENT_POLLS = int(os.getenv('BIN_WATCH_CONCURRENCY', 8))
+MAX_POLLS_PER_SECOND = float(os.getenv('BIN_WATCH_RATE', 10.0))
+
+# called with the records (see filebin.list_files) of new or changed .nglyph and label files, returns True once it has what it needs
+OnFiles = Callable[[list[BinFile]], Awaitable[bool]]
+
+
+class _Watch:
+    __slots__ = ('bin', 'on_files', 'deadline', 'interval', 'due', 'seen', 'lock')
+
+    def __init__(self, bin: str, on_files: OnFiles, deadline: float):
+        self.bin = bin
+        self.on_files = on_files
+        self.deadline = deadline
+        self.interval = INITIAL_INTERVAL
+        self.due = 0.0
+        self.seen: set[tuple] = set()
+        self.lock = asyncio.Lock()
+
+
+class BinWatcher:
+    """
+    Polls pending filebins until a glyph file shows up, the callback accepts it or the watch times out.
+    """
+    def __init__(self, max_concurrent_polls: int = MAX_CONCURRENT_POLLS, max_polls_per_second: float = MAX_POLLS_PER_SECOND):
+        self.max_concurrent_polls = max_concurrent_polls
+        self.max_polls_per_second = max_polls_per_second
+        self._watches: dict[str, _Watch] = {}
+        self._heap: list[tuple[float, int, str]] = []
+        self._seq = itertools.count()
+        self._wakeup = asyncio.Event()
+        self._slots: asyncio.Semaphore | None = None
+        self._tasks: set[asyncio.Task] = set()
+        self._runner: asyncio.Task | None = None
+        self._last_poll = 0.0
+        self.polls = 0
+        self.failures = 0
+        self.found = 0
+
+    def start(self):
+        """
+        Start the background loop. Called once when the bot starts.
+        """
+        if self._runner is None:
+            self._slots = asyncio.Semaphore(self.max_concurrent_polls)
+            self._runner = asyncio.create_task(self._run())
+            print('Started filebin watcher')
+
+    async def stop(self):
+        """
+        Stop the background loop and drop every watch.
+        """
+        if self._runner is None:
+            return
+        self._runner.cancel()
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(self._runner, *self._tasks, return_exceptions=True)
+        self._runner = None
+        self._watches.clear()
+        self._heap.clear()
+        print('Stopped filebin watcher')
+
+    def watch(self, bin: str, on_files: OnFiles, timeout: float):
+        """
+        Start watching a bin for timeout seconds.
+        """
+        loop = asyncio.get_running_loop()
+        watch = _Watch(bin, on_files, loop.time() + timeout)
+        self._watches[bin] = watch
+        self._schedule(watch, loop.time())
+
+    def unwatch(self, bin: str):
+        """
+        Stop watching a bin, its scheduled poll is skipped.
+        """
+        self._watches.pop(bin, None)
+
+    def is_watching(self, bin: str) -> bool:
+        return bin in self._watches
+
+    async def poll_now(self, bin: str):
+        """
+        Poll a watched bin right away, e.g. when the user says the upload is done.
+        """
+        watch = self._watches.get(bin)
+        if watch is not None:
+            await self._poll(watch)
+
+    def stats(self) -> dict:
+        """
+        Get the number of watched bins and the poll counters.
+        """
+        return {'watching': len(self._watches), 'in_flight': len(self._tasks), 'polls': self.polls, 'failures': self.failures, 'found': self.found}
+
+    def _schedule(self, watch: _Watch, now: float):
+        # equal jitter: at least half the interval, so bins watched at the same time drift apart
+        watch.due = now + watch.interval / 2 + random.uniform(0, watch.interval / 2)
+        heapq.heappush(self._heap, (watch.due, next(self._seq), watch.bin))
+        self._wakeup.set()
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            self._wakeup.clear()
+            if not self._heap:
+                await self._wakeup.wait()
+                continue
+            due, _, bin = self._heap[0]
+            delay = due - loop.time()
+            if delay > 0:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            heapq.heappop(self._heap)
+            watch = self._watches.get(bin)
+            if watch is None or watch.due != due:
+                # unwatched, or rescheduled by a poll_now since this entry was pushed
+                continue
+
+            # spread polls evenly under the global rate limit and the concurrency cap
+            gap = 1 / self.max_polls_per_second - (loop.time() - self._last_poll)
+            if gap > 0:
+                await asyncio.sleep(gap)
+            await self._slots.acquire()
+            self._last_poll = loop.time()
+            task = asyncio.create_task(self._poll(watch, acquired=True))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _poll(self, watch: _Watch, acquired: bool = False):
+        loop = asyncio.get_running_loop()
+        try:
+            async with watch.lock:
+                if self._watches.get(watch.bin) is not watch:
+                    return
+                if loop.time() >= watch.deadline:
+                    self.unwatch(watch.bin)
+                    return
+                self.polls += 1
+                try:
+                    # always ask filebin, the fresh answer is cached for the checks that follow
+                    files = await filebin.list_files(watch.bin, max_age=0)
+                except Exception as e:
+                    self.failures += 1
+                    print(f'Failed to poll bin {watch.bin}: {e}')
+                    files = []
+                if files is None:
+                    # the bin was deleted
+                    self.unwatch(watch.bin)
+                    return
+
+                records = {(file.filename, file.sha256 or file.updated_at or None): file for file in files}
+                new = records.keys() - watch.seen
+                watch.seen |= records.keys()
+                glyph_files = [records[key] for key in sorted(new) if key[0].lower().endswith(filebin.GLYPH_FILE_EXTENSIONS)]
+                if glyph_files:
+                    self.found += 1
+                    try:
+                        accepted = await watch.on_files(glyph_files)
+                    except Exception as e:
+                        print(f'Handling the upload to bin {watch.bin} failed: {e}')
+                        accepted = False
+                    if accepted:
+                        self.unwatch(watch.bin)
+                        return
+
+                # the user is uploading, look again soon; otherwise back off
+                watch.interval = INITIAL_INTERVAL if new else min(watch.interval * BACKOFF, MAX_INTERVAL)
+                if self._watches.get(watch.bin) is watch:
+                    self._schedule(watch, loop.time())
+        finally:
+            if acquired:
+                self._slots.release()
+
+
+bin_watcher = BinWatcher()
@@ -3,17 +3,126 @@ if __name__ == "__main__":
     exit()
 
 from filebin_client import Client
-from filebin_client.api.bin_ import get_bin, delete_bin, put_bin
+from filebin_client.api.bin_ import get_bin, delete_bin, put_bin, get_archive_bin_tar
 from filebin_client.api.file import get_bin_filename, post_bin_filename
+from filebin_client.errors import ResponseTooLarge
+from filebin_client.models import BinDetails, BinFile
 from filebin_client.types import File
-import uuid
-import json
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+import contextlib
+from http import HTTPStatus
+from typing import AsyncIterator, Callable
+import asyncio
+import hashlib
+import httpx
+import io
+import os
+import tarfile
+import threading
 import time
+import uuid
 
 base_url = "https://filebin.net"
 
+
+# glyph files are small, anything larger than this is not read
+MAX_FILE_BYTES = int(os.getenv('FILEBIN_MAX_FILE_BYTES', 4 * 1024 ** 2))
+# a whole bin fetched as one archive stops being read past this
+MAX_ARCHIVE_BYTES = int(os.getenv('FILEBIN_MAX_ARCHIVE_BYTES', 32 * 1024 ** 2))
+# 'archive' takes the uploads of a bin from one tar stream, 'files' downloads them one by one
+INGEST_MODE = os.getenv('FILEBIN_INGEST_MODE', 'archive')
+GLYPH_FILE_EXTENSIONS = ('.nglyph', '.txt')
+# threads reading archives, each one is held for the whole download of a bin
+ARCHIVE_WORKERS = int(os.getenv('FILEBIN_ARCHIVE_WORKERS', 4))
+# how long the parsed meta data of a bin is reused, long enough for the checks of one interaction
+BIN_CACHE_TTL = float(os.getenv('FILEBIN_CACHE_TTL', 3.0))
+
+
+class IngestError(Exception):
+    """
+    Raised when a file can't be taken from a bin: too large, failed download or checksum mismatch.
+    """
+    def __init__(self, message: str, filename: str | None = None):
+        self.filename = filename
+        super().__init__(message)
+
+
+class FilebinError(Exception):
+    """
+    Raised when filebin answers with an unexpected status code.
+    """
+    def __init__(self, status_code: int):
+        self.status_code = status_code
+        super().__init__(f'filebin returned status {status_code}')
+
+# One long-lived client for every filebin request. The underlying httpx.AsyncClient
+# keeps a pool of connections alive so we don't pay a TCP+TLS handshake per call.
+_client: Client | None = None
+_client_args: dict = {}
+# archives are read on their own threads, so a slow bin doesn't hold up the shared default executor
+_archive_executor: ThreadPoolExecutor | None = None
+
+
+def configure_client(**httpx_args):
+    """
+    Pass extra arguments (e.g. event_hooks) to the httpx client the shared filebin client is created with.
+    Call it before the client is first used or after close_client.
+    """
+    global _client_args
+    if _client is not None:
+        raise RuntimeError('The filebin client is already open, close it first.')
+    _client_args = httpx_args
+
+
+def get_client() -> Client:
+    """
+    Get the shared filebin client, creating it if it has not been opened yet.
+    """
+    global _client
+    if _client is None:
+        _client = Client(
+            base_url=base_url,
+            headers={'accept': 'application/json'},
+            timeout=httpx.Timeout(15.0, connect=5.0),
+            httpx_args={'limits': httpx.Limits(max_connections=20, max_keepalive_connections=10, keepalive_expiry=30.0), **_client_args},
+        )
+    return _client
+
+
+def _get_archive_executor() -> ThreadPoolExecutor:
+    global _archive_executor
+    if _archive_executor is None:
+        _archive_executor = ThreadPoolExecutor(max_workers=ARCHIVE_WORKERS, thread_name_prefix='filebin-archive')
+    return _archive_executor
+
+
+async def open_client() -> Client:
+    """
+    Open the shared filebin client. Called once when the bot starts.
+    """
+    client = get_client()
+    await client.__aenter__()
+    print(f'Opened filebin client for {base_url}')
+    return client
+
+
+async def close_client():
+    """
+    Close the shared filebin client and release its pooled connections. Called when the bot shuts down.
+    """
+    global _client, _archive_executor
+    if _archive_executor is not None:
+        _archive_executor.shutdown(wait=False, cancel_futures=True)
+        _archive_executor = None
+    if _client is None:
+        return
+    await _client.get_async_httpx_client().aclose()
+    _client = None
+    print(f'Closed filebin client for {base_url}')
+
+
 async def create_filebin(title: str = None):
-    _client = Client(base_url=base_url, headers={'accept': 'application/json'})
     count = 0
     while True:
         MyBin = str(uuid.uuid4())
@@ -22,26 +131,27 @@ async def create_filebin(title: str = None):
             break
         else:
             print(f'Bin {MyBin} already exists. Trying again in .15 seconds...')
-            time.sleep(0.15)
+            await asyncio.sleep(0.15)
             if count >= 5:
                 print(f'Timeout. Tried creating new bin 5 times. Exiting...')
                 return None
             count += 1
 
     print(f'Created bin: {base_url}/{MyBin}')
+    forget_bin(MyBin)
 
-    payload = "Upload Label or nglyph file".encode('utf-8')
+    filename = "Upload Label or nglyph file"
     if title is not None:
-        payload += " for {title}".encode('utf-8')
+        filename += f" for {title}"
 
     body = File(
-        payload=payload,
+        payload=filename.encode('utf-8'),
     )
 
-    result = post_bin_filename.sync_detailed(
+    result = await post_bin_filename.asyncio_detailed(
         bin_=MyBin,
-        filename=payload,
-        client=_client,
+        filename=filename,
+        client=get_client(),
         body=body,
     )
 
@@ -49,32 +159,74 @@ async def create_filebin(title: str = None):
 
 
 async def delete_filebin(bin):
-    _client = Client(base_url=base_url, headers={'accept': 'application/json'})
-
-    result = delete_bin.sync_detailed(
+    result = await delete_bin.asyncio_detailed(
         bin_=bin,
-        client=_client
+        client=get_client()
     )
+    forget_bin(bin)
 
     print(f'Deleted bin: {bin}')
 
 
-async def get_files_in_bin(bin):
-    _client = Client(base_url=base_url, headers={'accept': 'application/json'})
+# bin -> (fetched at, meta data), oldest fetch first; bins that don't exist (yet) are never cached
+_bin_cache: dict[str, tuple[float, BinDetails]] = {}
+
+
+def forget_bin(bin):
+    """
+    Drop the cached meta data of a bin, after changing it.
+    """
+    _bin_cache.pop(bin, None)
 
-    result = get_bin.sync_detailed(
+
+async def get_bin_details(bin, max_age: float = BIN_CACHE_TTL) -> BinDetails | None:
+    """
+    Get the parsed meta data of a bin and its files, or None if the bin doesn't exist.
+    A response younger than max_age seconds is reused, pass 0 to always ask filebin.
+    """
+    now = time.monotonic()
+    cached = _bin_cache.get(bin)
+    if cached is not None and now - cached[0] < max_age:
+        return cached[1]
+
+    result = await get_bin.asyncio_detailed(
         bin_=bin,
-        client=_client
+        client=get_client()
     )
+    if result.status_code == HTTPStatus.NOT_FOUND:
+        # the bin may be created any moment, the next check has to see it
+        _bin_cache.pop(bin, None)
+        return None
+    if result.status_code != HTTPStatus.OK:
+        raise FilebinError(result.status_code)
+    details = result.parsed
+
+    # re-inserting keeps the dict ordered by fetch time, so expired entries are always at the front
+    _bin_cache.pop(bin, None)
+    _bin_cache[bin] = (now, details)
+    for key, (fetched, _) in list(_bin_cache.items()):
+        if now - fetched < BIN_CACHE_TTL:
+            break
+        del _bin_cache[key]
+    return details
 
-    result = result.content.decode()
-    result = json.loads(result)
-    files = result['files']
 
+async def list_files(bin, max_age: float = BIN_CACHE_TTL) -> list[BinFile] | None:
+    """
+    Get the file records (filename, bytes_, sha256, updated_at, ...) of a bin, or None if the bin doesn't exist.
+    """
+    details = await get_bin_details(bin, max_age)
+    if details is None:
+        return None
+    return details.files
+
+
+async def get_files_in_bin(bin):
+    files = await list_files(bin)
 
     filenames = []
-    for file in files:
-        filenames.append(file['filename'])
+    for file in files or []:
+        filenames.append(file.filename)
 
     return filenames
 
@@ -100,16 +252,9 @@ async def check_for_nglyph_file_in_bin(bin):
     return False 
 
 async def is_bin_empty(bin):
-    _client = Client(base_url=base_url, headers={'accept': 'application/json'})
-
-    result = get_bin.sync_detailed(
-        bin_=bin,
-        client=_client
-    )
-    
-    result = result.content.decode()
-    result = json.loads(result)
-    number_of_files = result['bin']['files']
+    details = await get_bin_details(bin)
+    # filebin leaves the count out for some bins, that is no files
+    number_of_files = (details.bin_.files or 0) if details is not None else 0
 
     print(f'Number of files in bin: {number_of_files}')
 
@@ -122,32 +267,191 @@ async def is_bin_empty(bin):
 
 
 async def lock_filebin(bin):
-    _client = Client(base_url=base_url, headers={'accept': 'application/json'})
-
-    result = put_bin.sync_detailed(
+    result = await put_bin.asyncio_detailed(
         bin_=bin,
-        client=_client
+        client=get_client()
     )
+    forget_bin(bin)
 
     print(f'Locked bin: {bin}')
 
-async def download_file_from_bin(bin, filename):
-    _client = Client(base_url=base_url, headers={'accept': 'application/json'})
+@dataclass(slots=True)
+class DownloadedFile:
+    """
+    A file downloaded from a bin into memory, with the SHA-256 computed while it streamed in.
+    """
+    filename: str
+    data: bytes
+    sha256: str
+
+
+async def fetch_file(bin, filename, max_bytes: int = MAX_FILE_BYTES, expected_sha256: str | None = None) -> DownloadedFile:
+    """
+    Stream a file from a bin into memory, never reading more than max_bytes.
+
+    Raises IngestError if the file is too large, the download fails or the checksum doesn't match the bin's.
+    """
+    # the redirect to the storage backend is followed on the pooled connections, the body is hashed as it comes in
+    digest = hashlib.sha256()
+    data = bytearray()
+    async with get_bin_filename.asyncio_stream(bin_=bin, filename=filename, client=get_client()) as response:
+        if response.status_code != HTTPStatus.OK:
+            raise IngestError(f'Downloading {filename} failed with status {response.status_code}.', filename)
+        try:
+            async for chunk in response.aiter_bytes(max_bytes):
+                digest.update(chunk)
+                data += chunk
+        except ResponseTooLarge as e:
+            if e.content_length is not None:
+                raise IngestError(f'{filename} is {e.content_length // 1024} KiB, the limit is {max_bytes // 1024} KiB.', filename) from None
+            raise IngestError(f'{filename} is larger than the limit of {max_bytes // 1024} KiB.', filename) from None
+
+    sha256 = digest.hexdigest()
+    if expected_sha256 is not None and sha256 != expected_sha256:
+        raise IngestError(f'{filename} was corrupted during the download, the checksum does not match.', filename)
+    return DownloadedFile(filename, bytes(data), sha256)
+
+
+async def _fetch_record(bin, file: BinFile, max_bytes: int) -> DownloadedFile:
+    # the bin already says how big the file is, don't even start a download that will be rejected
+    if file.bytes_ and file.bytes_ > max_bytes:
+        raise IngestError(f'{file.filename} is {file.bytes_ // 1024} KiB, the limit is {max_bytes // 1024} KiB.', file.filename)
+    try:
+        return await fetch_file(bin, file.filename, max_bytes, file.sha256 or None)
+    except httpx.HTTPError as e:
+        raise IngestError(f'Downloading {file.filename} failed: {e}', file.filename) from e
+
+
+async def fetch_files(bin, files: list[BinFile], max_bytes: int = MAX_FILE_BYTES) -> list[DownloadedFile | IngestError]:
+    """
+    Download several files of a bin (records from list_files) concurrently. Failed files are returned as their IngestError.
+    """
+    results = await asyncio.gather(*(_fetch_record(bin, file, max_bytes) for file in files), return_exceptions=True)
+    for result in results:
+        if isinstance(result, BaseException) and not isinstance(result, IngestError):
+            raise result
+    return results
+
+
+class _PullReader(io.RawIOBase):
+    # blocking file object for tarfile in a worker thread, every read pulls the next chunk from the event loop
+    def __init__(self, pull: Callable[[], bytes]):
+        self._pull = pull
+        self._buffer = b''
+
+    def readable(self) -> bool:
+        return True
 
-    result = get_bin_filename.sync_detailed(
-        bin_=bin,
-        filename=filename,
-        client=_client
-    )
-    location = result.headers['location']
-    print(location)
-    
-    # get request at location and write to file
-    async with _client.get_async_httpx_client() as client:
-        async with client.stream('GET', location) as response:
-            with open(filename, 'wb') as f:
-                async for chunk in response.aiter_bytes():
-                    f.write(chunk)
-
-    # return filename and path
-    return filename
\ No newline at end of file
+    def readinto(self, buffer) -> int:
+        if not self._buffer:
+            self._buffer = self._pull()
+        count = min(len(buffer), len(self._buffer))
+        buffer[:count] = self._buffer[:count]
+        self._buffer = self._buffer[count:]
+        return count
+
+
+class _ArchiveFailed:
+    # a failure of the whole archive, told apart from the IngestErrors of single files
+    def __init__(self, error: Exception):
+        self.error = error
+
+
+_DONE = object()
+
+
+async def iter_bin_archive(bin, extensions: tuple[str, ...] = GLYPH_FILE_EXTENSIONS, max_bytes: int = MAX_FILE_BYTES,
+                           max_archive_bytes: int = MAX_ARCHIVE_BYTES, expected_sha256: dict[str, str] | None = None) -> AsyncIterator[DownloadedFile | IngestError]:
+    """
+    Fetch a whole bin as one tar stream and yield its files with the given extensions as soon as each has arrived.
+    The archive is never buffered: tarfile reads it in streaming mode in a worker thread while it downloads.
+
+    Files that can't be used are yielded as their IngestError, a failure of the whole archive is raised.
+    """
+    loop = asyncio.get_running_loop()
+    results: asyncio.Queue = asyncio.Queue()
+    stop = threading.Event()
+    async with get_archive_bin_tar.asyncio_stream(bin_=bin, client=get_client()) as response:
+        if response.status_code == HTTPStatus.NOT_FOUND:
+            raise IngestError(f'Bin {bin} does not exist.')
+        if response.status_code != HTTPStatus.OK:
+            raise IngestError(f'Downloading bin {bin} failed with status {response.status_code}.')
+        chunks = response.aiter_bytes(max_archive_bytes)
+
+        async def next_chunk() -> bytes:
+            if stop.is_set():
+                return b''
+            try:
+                return await chunks.__anext__()
+            except StopAsyncIteration:
+                return b''
+            except ResponseTooLarge:
+                raise IngestError(f'Bin {bin} is larger than the limit of {max_archive_bytes // 1024 ** 2} MiB.') from None
+
+        def deliver(item):
+            loop.call_soon_threadsafe(results.put_nowait, item)
+
+        def extract():
+            reader = _PullReader(lambda: asyncio.run_coroutine_threadsafe(next_chunk(), loop).result())
+            try:
+                with tarfile.open(fileobj=reader, mode='r|') as archive:
+                    for member in archive:
+                        if stop.is_set():
+                            break
+                        name = member.name.rsplit('/', 1)[-1]
+                        if not member.isfile() or not name.lower().endswith(extensions):
+                            continue
+                        if member.size > max_bytes:
+                            deliver(IngestError(f'{name} is {member.size // 1024} KiB, the limit is {max_bytes // 1024} KiB.', name))
+                            continue
+                        data = archive.extractfile(member).read()
+                        sha256 = hashlib.sha256(data).hexdigest()
+                        if expected_sha256 and expected_sha256.get(name, sha256) != sha256:
+                            deliver(IngestError(f'{name} was corrupted during the download, the checksum does not match.', name))
+                            continue
+                        deliver(DownloadedFile(name, data, sha256))
+            except Exception as e:
+                if not stop.is_set():
+                    deliver(_ArchiveFailed(e))
+            finally:
+                deliver(_DONE)
+
+        worker = loop.run_in_executor(_get_archive_executor(), extract)
+        try:
+            while (item := await results.get()) is not _DONE:
+                if isinstance(item, _ArchiveFailed):
+                    if isinstance(item.error, IngestError):
+                        raise item.error
+                    raise IngestError(f'Reading the archive of bin {bin} failed: {item.error}') from item.error
+                yield item
+        finally:
+            # the consumer may stop early, make the worker's next read return nothing so it finishes
+            stop.set()
+            await worker
+
+
+async def ingest(bin, files: list[BinFile], mode: str = INGEST_MODE, max_bytes: int = MAX_FILE_BYTES) -> AsyncIterator[DownloadedFile | IngestError]:
+    """
+    Yield the given files of a bin (records from list_files) in the order they finish downloading,
+    taken from one tar stream of the whole bin in 'archive' mode or downloaded concurrently one by one in 'files' mode.
+    Use it with contextlib.aclosing when not consuming every file.
+    """
+    if mode == 'archive':
+        wanted = {file.filename for file in files}
+        expected = {file.filename: file.sha256 for file in files if file.sha256}
+        async with contextlib.aclosing(iter_bin_archive(bin, max_bytes=max_bytes, expected_sha256=expected)) as archive:
+            async for item in archive:
+                if item.filename in wanted:
+                    yield item
+        return
+
+    downloads = [asyncio.ensure_future(_fetch_record(bin, file, max_bytes)) for file in files]
+    try:
+        for download in asyncio.as_completed(downloads):
+            try:
+                yield await download
+            except IngestError as e:
+                yield e
+    finally:
+        for download in downloads:
+            download.cancel()
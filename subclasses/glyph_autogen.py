@@ -0,0 +1,298 @@
+if __name__ == "__main__":
+    print("This is a subclass. Please use the main bot.py file.")
+    exit()
+
+# Generates a glyph timeline from audio.
+# The audio is decoded to PCM by ffmpeg and analysed in fixed-size chunks with a streaming STFT:
+# band energies become a glow on the zones, spectral-flux onsets flash the zones of the bands that changed,
+# and a beat tracker over the onset envelope adds a pulse on every beat.
+
+import abc
+import asyncio
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from .glyph_tools import MAX_BRIGHTNESS, PHONE_ZONES, GlyphTimeline
+
+# 24 kHz with a hop of 400 samples gives exactly one analysis frame per 16.666ms glyph frame
+SAMPLE_RATE = 24000
+HOP = 400
+N_FFT = 1024
+# seconds of PCM read from ffmpeg and analysed at once, this bounds the memory of a run
+CHUNK_SECONDS = 2
+# frames processed per block, keeps decay ** -block_frames well inside float64 range
+BLOCK_FRAMES = 120
+
+MIN_FREQUENCY = 40
+MAX_FREQUENCY = 10000
+GLOW_LEVEL = 0.45
+BEAT_LEVEL = 0.3
+DECAY = 0.86
+THRESHOLD_FRAMES = 60
+THRESHOLD_SCALE = 1.6
+MIN_ONSET_GAP = 6
+# beat tracking works on the last few seconds of the onset envelope, between 60 and 180 BPM
+TEMPO_WINDOW = 8 * 60
+MIN_BEAT_PERIOD = 20
+MAX_BEAT_PERIOD = 60
+
+
+def _frame_count(samples: int) -> int:
+    return (samples - N_FFT) // HOP + 1 if samples >= N_FFT else 0
+
+
+class DecodeError(Exception):
+    """
+    Raised when ffmpeg fails to decode the audio.
+    """
+    def __init__(self, stderr: str):
+        self.stderr = stderr
+        super().__init__(stderr)
+
+
+class SpectralStream(abc.ABC):
+    """
+    Streaming STFT: feed it mono float32 PCM at SAMPLE_RATE in any chunk size,
+    subclasses get the log magnitude spectrum and spectral flux of every glyph frame in blocks.
+    """
+    def __init__(self):
+        self.window = np.hanning(N_FFT).astype(np.float32)
+        # pad the start so frame k ends at sample (k + 1) * HOP
+        self._pending = np.zeros(N_FFT - HOP, dtype=np.float32)
+        self._previous_spectrum = None
+        self._frame = 0
+
+    def feed(self, samples: np.ndarray):
+        """
+        Analyse the next PCM samples.
+        """
+        buffer = np.concatenate([self._pending, samples.astype(np.float32, copy=False)])
+        # only whole blocks, so the blocks and the output don't depend on the chunk sizes the audio is fed in
+        count = _frame_count(len(buffer))
+        self._analyse(buffer, count - count % BLOCK_FRAMES)
+
+    def flush(self):
+        """
+        Analyse the samples that don't fill a whole block or hop yet.
+        """
+        buffer = self._pending
+        remainder = len(buffer) - _frame_count(len(buffer)) * HOP
+        if remainder > N_FFT - HOP:
+            buffer = np.concatenate([buffer, np.zeros(N_FFT - remainder % HOP, dtype=np.float32)])
+        self._analyse(buffer, _frame_count(len(buffer)))
+
+    def _analyse(self, buffer: np.ndarray, count: int):
+        if count > 0:
+            frames = sliding_window_view(buffer, N_FFT)[::HOP][:count]
+            for start in range(0, count, BLOCK_FRAMES):
+                block = frames[start:start + BLOCK_FRAMES]
+                spectrum = np.log1p(10 * np.abs(np.fft.rfft(block * self.window, axis=1))).astype(np.float32)
+                # spectral flux: how much energy appeared since the previous frame
+                previous = np.vstack([spectrum[:1] if self._previous_spectrum is None else self._previous_spectrum[None], spectrum[:-1]])
+                flux = np.maximum(spectrum - previous, 0).sum(axis=1)
+                self._previous_spectrum = spectrum[-1]
+                self._process(spectrum, flux)
+                self._frame += len(block)
+        self._pending = buffer[count * HOP:].copy()
+
+    @abc.abstractmethod
+    def _process(self, spectrum: np.ndarray, flux: np.ndarray):
+        """
+        Handle the next block of log-magnitude spectra and their spectral flux.
+        """
+
+
+class OnsetEnvelope(SpectralStream):
+    """
+    Collects the spectral flux of every glyph frame, the onset strength of the audio over time.
+    """
+    def __init__(self):
+        super().__init__()
+        self._blocks: list[np.ndarray] = []
+
+    def _process(self, spectrum: np.ndarray, flux: np.ndarray):
+        self._blocks.append(flux)
+
+    def finish(self) -> np.ndarray:
+        """
+        Flush the remaining samples and return the envelope.
+        """
+        self.flush()
+        return np.concatenate(self._blocks) if self._blocks else np.zeros(0, dtype=np.float32)
+
+
+class GlyphGenerator(SpectralStream):
+    """
+    Streaming audio to glyph converter. Feed it mono float32 PCM at SAMPLE_RATE in any chunk size, then call finish().
+    """
+    def __init__(self, phone_model: str):
+        super().__init__()
+        self.phone_model = phone_model
+        self.zones = PHONE_ZONES[phone_model][-1]
+        # one log-spaced band per zone, low frequencies on the first zones
+        frequencies = np.fft.rfftfreq(N_FFT, 1 / SAMPLE_RATE)
+        edges = np.geomspace(MIN_FREQUENCY, MAX_FREQUENCY, self.zones + 1)
+        self.bands = np.stack([(frequencies >= low) & (frequencies < high) for low, high in zip(edges[:-1], edges[1:])], axis=1).astype(np.float32)
+        self.bands /= np.maximum(self.bands.sum(axis=0), 1)
+
+        self._previous_bands = np.zeros(self.zones, dtype=np.float32)
+        self._band_peak = np.full(self.zones, 1e-3, dtype=np.float32)
+        self._flux_history = np.zeros(0, dtype=np.float32)
+        self._envelope = np.zeros(0, dtype=np.float32)
+        self._levels = np.zeros(self.zones, dtype=np.float64)
+        self._last_onset = -MIN_ONSET_GAP
+        self._beat_period = None
+        self._next_beat = None
+        self._output: list[np.ndarray] = []
+        self.onsets: list[int] = []
+        self.beats: list[int] = []
+
+    def finish(self) -> GlyphTimeline:
+        """
+        Flush the remaining samples and return the generated timeline.
+        """
+        self.flush()
+        frames = np.concatenate(self._output) if self._output else np.zeros((0, self.zones), dtype=np.uint16)
+        return GlyphTimeline(self.phone_model, frames)
+
+    def _process(self, spectrum: np.ndarray, flux: np.ndarray):
+        count = len(spectrum)
+        bands = spectrum @ self.bands
+        band_flux = np.maximum(bands - np.vstack([self._previous_bands[None], bands[:-1]]), 0)
+        self._previous_bands = bands[-1]
+        self._band_peak = np.maximum(self._band_peak * 0.995 ** count, bands.max(axis=0))
+        glow = (bands / self._band_peak) ** 2 * GLOW_LEVEL
+
+        onsets = self._detect_onsets(flux)
+        beats = self._track_beats(flux, onsets)
+
+        # targets per frame: the glow, full brightness on the bands that caused an onset, a pulse on beats
+        targets = glow.astype(np.float64)
+        for index in onsets:
+            strongest = band_flux[index] >= 0.5 * band_flux[index].max()
+            targets[index, strongest] = 1.0
+        for index in beats:
+            targets[index] = np.maximum(targets[index], BEAT_LEVEL)
+
+        # exponential decay of every zone, levels[t] = max(targets[s] * DECAY ** (t - s)) over s <= t, in closed form
+        scale = DECAY ** -np.arange(1, count + 1, dtype=np.float64)
+        levels = np.maximum.accumulate(targets * scale[:, None], axis=0) / scale[:, None]
+        levels = np.maximum(levels, self._levels[None] * (1 / scale)[:, None])
+        self._levels = levels[-1]
+
+        self._output.append((np.clip(levels, 0.0, 1.0) * MAX_BRIGHTNESS).astype(np.uint16))
+        self.onsets.extend(self._frame + onsets)
+        self.beats.extend(self._frame + beats)
+
+    def _detect_onsets(self, flux: np.ndarray) -> np.ndarray:
+        # adaptive threshold: moving mean + spread of the flux over the last THRESHOLD_FRAMES frames
+        history = np.concatenate([self._flux_history, flux])
+        windows = sliding_window_view(np.pad(history, (max(0, THRESHOLD_FRAMES - len(self._flux_history)), 0), mode='edge'), THRESHOLD_FRAMES)[-len(flux):]
+        threshold = windows.mean(axis=1) + THRESHOLD_SCALE * windows.std(axis=1)
+        self._flux_history = history[-THRESHOLD_FRAMES:]
+
+        previous = np.concatenate([history[-len(flux) - 1:-len(flux)] if len(history) > len(flux) else flux[:1], flux[:-1]])
+        following = np.concatenate([flux[1:], [-np.inf]])
+        candidates = np.flatnonzero((flux > threshold) & (flux >= previous) & (flux > following))
+
+        onsets = []
+        for index in candidates:
+            if self._frame + index - self._last_onset >= MIN_ONSET_GAP:
+                onsets.append(index)
+                self._last_onset = self._frame + index
+        return np.array(onsets, dtype=np.int64)
+
+    def _track_beats(self, flux: np.ndarray, onsets: np.ndarray) -> np.ndarray:
+        self._envelope = np.concatenate([self._envelope, flux])[-TEMPO_WINDOW:]
+        if len(self._envelope) >= 4 * MAX_BEAT_PERIOD:
+            # tempo from the autocorrelation of the onset envelope
+            envelope = self._envelope - self._envelope.mean()
+            spectrum = np.fft.rfft(envelope, n=2 * len(envelope))
+            autocorrelation = np.fft.irfft(spectrum * np.conj(spectrum))[MIN_BEAT_PERIOD:MAX_BEAT_PERIOD + 1]
+            if autocorrelation.max() > 0:
+                self._beat_period = MIN_BEAT_PERIOD + int(np.argmax(autocorrelation))
+        if self._beat_period is None:
+            return np.zeros(0, dtype=np.int64)
+
+        if self._next_beat is None:
+            self._next_beat = self._frame + (int(onsets[0]) if len(onsets) else 0)
+        beats = []
+        end = self._frame + len(flux)
+        onset_frames = self._frame + onsets
+        while self._next_beat < end:
+            # snap to a nearby onset so the beat grid follows the music
+            nearby = onset_frames[np.abs(onset_frames - self._next_beat) <= 3]
+            beat = int(nearby[0]) if len(nearby) else self._next_beat
+            if beat >= self._frame:
+                beats.append(beat - self._frame)
+            self._next_beat = beat + self._beat_period
+        return np.array(beats, dtype=np.int64)
+
+
+async def analyse(audio: bytes, stream: SpectralStream):
+    """
+    Decode audio (any format ffmpeg reads) through a pipe and feed it to stream chunk by chunk.
+
+    Raises DecodeError if ffmpeg can't decode the audio.
+    """
+    ffmpeg_cmd = ['ffmpeg', '-nostdin', '-i', 'pipe:0', '-vn', '-ac', '1', '-ar', str(SAMPLE_RATE), '-f', 's16le', 'pipe:1']
+    process = await asyncio.create_subprocess_exec(*ffmpeg_cmd, stdin=asyncio.subprocess.PIPE, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE)
+
+    async def write_input():
+        try:
+            process.stdin.write(audio)
+            await process.stdin.drain()
+            process.stdin.close()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    writer = asyncio.create_task(write_input())
+    stderr_task = asyncio.create_task(process.stderr.read())
+    loop = asyncio.get_running_loop()
+    chunk_bytes = CHUNK_SECONDS * SAMPLE_RATE * 2
+    try:
+        while True:
+            try:
+                data = await process.stdout.readexactly(chunk_bytes)
+            except asyncio.IncompleteReadError as e:
+                # the last block, drop a trailing odd byte
+                data = e.partial[:len(e.partial) - len(e.partial) % 2]
+            if not data:
+                break
+            samples = np.frombuffer(data, dtype='<i2').astype(np.float32) / 32768
+            await loop.run_in_executor(None, stream.feed, samples)
+            if len(data) < chunk_bytes:
+                break
+        await writer
+        stderr = await stderr_task
+        await process.wait()
+    finally:
+        # cancelled or feed failed while ffmpeg is still running, don't leave it behind
+        if process.returncode is None:
+            process.kill()
+            await process.wait()
+        writer.cancel()
+        stderr_task.cancel()
+    if process.returncode != 0:
+        raise DecodeError(stderr.decode(errors='ignore'))
+
+
+async def generate(audio: bytes, phone_model: str) -> GlyphTimeline:
+    """
+    Generate a glyph timeline from audio.
+
+    Raises DecodeError if ffmpeg can't decode the audio.
+    """
+    generator = GlyphGenerator(phone_model)
+    await analyse(audio, generator)
+    return generator.finish()
+
+
+async def onset_envelope(audio: bytes) -> np.ndarray:
+    """
+    Get the onset strength of audio at the glyph frame rate.
+
+    Raises DecodeError if ffmpeg can't decode the audio.
+    """
+    envelope = OnsetEnvelope()
+    await analyse(audio, envelope)
+    return envelope.finish()
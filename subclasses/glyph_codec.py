@@ -0,0 +1,121 @@
+if __name__ == "__main__":
+    print("This is a subclass. Please use the main bot.py file.")
+    exit()
+
+# Compact storage format for glyph timelines with random access by time.
+# The timeline is cut into chunks of CHUNK_FRAMES frames, every chunk stores the per zone change in brightness
+# zone by zone (mostly zeros, so they deflate well) and is compressed on its own. An offset index after the header
+# lets a reader seek straight to the chunks of a time window and inflate only those.
+#
+#   header   magic, version, phone, zones, frames, chunk frames, chunk count, metadata size
+#   index    chunk count + 1 little endian uint32 offsets into the chunk data, the last one is its end
+#   metadata zlib compressed JSON with CUSTOM1 and the watermark
+#   chunks   zlib compressed int16 deltas, zone-major
+
+import io
+import json
+import struct
+import zlib
+from typing import BinaryIO
+import numpy as np
+from .glyph_tools import FRAME_MS, PHONE_ZONES, GlyphFormatError, GlyphTimeline
+
+MAGIC = b'NGLC'
+VERSION = 1
+# 4 seconds per chunk, a window costs at most two partial chunks of extra inflating
+CHUNK_FRAMES = 240
+COMPRESSION_LEVEL = 9
+
+_HEADER = struct.Struct('<4sBBHIHII')
+_PHONES = list(PHONE_ZONES)
+
+
+def _encode_chunk(frames: np.ndarray) -> bytes:
+    deltas = np.diff(frames.astype(np.int16), axis=0, prepend=np.zeros((1, frames.shape[1]), dtype=np.int16))
+    return zlib.compress(np.ascontiguousarray(deltas.T).astype('<i2').tobytes(), COMPRESSION_LEVEL)
+
+
+def _decode_chunk(data: bytes, frame_count: int, zones: int) -> np.ndarray:
+    try:
+        deltas = np.frombuffer(zlib.decompress(data), dtype='<i2')
+    except zlib.error as e:
+        raise GlyphFormatError(f'Corrupt glyph chunk: {e}') from None
+    if deltas.size != frame_count * zones:
+        raise GlyphFormatError('Corrupt glyph chunk: wrong number of values.')
+    return np.cumsum(deltas.reshape(zones, frame_count), axis=1, dtype=np.int16).T.astype(np.uint16)
+
+
+def encode(timeline: GlyphTimeline, chunk_frames: int = CHUNK_FRAMES) -> bytes:
+    """
+    Encode a timeline in the chunked format.
+    """
+    frames = timeline.frames
+    chunks = [_encode_chunk(frames[start:start + chunk_frames]) for start in range(0, len(frames), chunk_frames)]
+    offsets = np.concatenate([[0], np.cumsum([len(chunk) for chunk in chunks], dtype=np.int64)]).astype('<u4')
+    metadata = zlib.compress(json.dumps({'CUSTOM1': timeline.custom1, 'WATERMARK': timeline.watermark}).encode('utf-8'))
+    header = _HEADER.pack(MAGIC, VERSION, _PHONES.index(timeline.phone_model), timeline.zones, len(frames), chunk_frames, len(chunks), len(metadata))
+    return b''.join([header, offsets.tobytes(), metadata, *chunks])
+
+
+class GlyphChunkReader:
+    """
+    Random access reader over an encoded timeline in any seekable binary file, e.g. a BytesIO or an SQLite blob.
+    Only the header and index are read up front, frames are read and inflated per chunk when asked for.
+    """
+    def __init__(self, f: BinaryIO):
+        self._file = f
+        header = f.read(_HEADER.size)
+        if len(header) != _HEADER.size or header[:4] != MAGIC:
+            raise GlyphFormatError('Not an encoded glyph timeline.')
+        _, version, phone, self.zones, self.frame_count, self.chunk_frames, chunk_count, metadata_size = _HEADER.unpack(header)
+        if version != VERSION:
+            raise GlyphFormatError(f'Unsupported encoded glyph version {version}.')
+        if phone >= len(_PHONES):
+            raise GlyphFormatError(f'Unknown phone model {phone}.')
+        self.phone_model = _PHONES[phone]
+        self._offsets = np.frombuffer(f.read(4 * (chunk_count + 1)), dtype='<u4').astype(np.int64)
+        metadata = json.loads(zlib.decompress(f.read(metadata_size)))
+        self.custom1 = metadata['CUSTOM1']
+        self.watermark = metadata['WATERMARK']
+        self._data_start = _HEADER.size + 4 * (chunk_count + 1) + metadata_size
+
+    @property
+    def duration_ms(self) -> float:
+        return self.frame_count * FRAME_MS
+
+    def read_frames(self, start: int = 0, stop: int | None = None) -> np.ndarray:
+        """
+        Get frames[start:stop] of the timeline, inflating only the chunks they are in.
+        """
+        stop = self.frame_count if stop is None else min(stop, self.frame_count)
+        start = max(0, start)
+        if start >= stop:
+            return np.zeros((0, self.zones), dtype=np.uint16)
+        first, last = start // self.chunk_frames, (stop - 1) // self.chunk_frames
+        # the chunks of a window are contiguous, so they are fetched with one read
+        self._file.seek(self._data_start + int(self._offsets[first]))
+        data = self._file.read(int(self._offsets[last + 1] - self._offsets[first]))
+        blocks = []
+        for chunk in range(first, last + 1):
+            begin, end = self._offsets[chunk] - self._offsets[first], self._offsets[chunk + 1] - self._offsets[first]
+            count = min(self.chunk_frames, self.frame_count - chunk * self.chunk_frames)
+            blocks.append(_decode_chunk(data[begin:end], count, self.zones))
+        frames = np.concatenate(blocks)
+        offset = first * self.chunk_frames
+        return frames[start - offset:stop - offset]
+
+    def read_window(self, start_ms: float = 0.0, end_ms: float | None = None) -> GlyphTimeline:
+        """
+        Get the part of the timeline between start_ms and end_ms as a timeline of its own.
+        """
+        # the epsilon keeps float error from adding or dropping a frame at exact frame boundaries
+        stop = None if end_ms is None else int(np.ceil(end_ms / FRAME_MS - 1e-6))
+        frames = self.read_frames(int(np.floor(start_ms / FRAME_MS + 1e-6)), stop)
+        return GlyphTimeline(self.phone_model, frames, list(self.custom1), self.watermark)
+
+
+def decode(data: bytes) -> GlyphTimeline:
+    """
+    Decode a whole encoded timeline.
+    """
+    return GlyphChunkReader(io.BytesIO(data)).read_window()
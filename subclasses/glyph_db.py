@@ -2,93 +2,654 @@ if __name__ == "__main__":
     print("This is a subclass. Please use the main bot.py file.")
     exit()
 
-import sqlite3
+import asyncio
+import hashlib
+import io
 import os
+import queue
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable
+from .glyph_codec import GlyphChunkReader, encode as encode_timeline
+from .glyph_preview import render_preview, timeline_from_archive
+from .glyph_tools import GlyphTimeline
+from .lru_cache import LRUCache
+from .title_index import TitleIndex
+
+DB_PATH = os.getenv('GLYPH_DB_PATH', 'Custom_Glyphs.db')
+READ_POOL_SIZE = int(os.getenv('GLYPH_DB_READERS', 4))
+# the writer commits up to this many queued writes in one transaction
+WRITE_BATCH_SIZE = 256
+# read-through caches for hot glyphs: metadata by number of entries, glyph data by total size
+METADATA_CACHE_ENTRIES = int(os.getenv('GLYPH_CACHE_ENTRIES', 4096))
+BLOB_CACHE_BYTES = int(os.getenv('GLYPH_BLOB_CACHE_BYTES', 32 * 1024 ** 2))
 
-#TODO:implement database shit
+CREATE_TABLE_SQL = '''
+CREATE TABLE IF NOT EXISTS "Custom_Glyphs" (
+    "id"	INTEGER,
+    "Title"	TEXT,
+    "Youtube_Link"	TEXT,
+    "Timestamp"	TEXT,
+    "Phone"	TEXT,
+    "Creator"	TEXT,
+    "Creator_ID"	INTEGER,
+    "Compressed_Glyphdata"	BLOB,
+    PRIMARY KEY("id")
+)
+'''
 
-def insert_data(Title, Youtube_Link, Timestamp, Phone, Creator, Creator_ID, Compressed_Glyphdata):
-    # Connect to the database
-    conn = sqlite3.connect('Custom_Glyphs.db')
-    cursor = conn.cursor()
+# glyph data lives in its own table, deduplicated by SHA-256, so metadata queries never read blob pages
+CREATE_BLOBS_SQL = '''
+CREATE TABLE IF NOT EXISTS Glyph_Blobs (
+    id INTEGER PRIMARY KEY,
+    Hash TEXT NOT NULL UNIQUE,
+    Size INTEGER NOT NULL,
+    Data BLOB NOT NULL
+)
+'''
 
-    # Prepare the SQL statement
-    insert_sql = '''
-    INSERT INTO Custom_Glyphs (Title, Youtube_Link, Timestamp, Phone, Creator, Creator_ID, Compressed_Glyphdata)
-    VALUES (?, ?, ?, ?, ?, ?, ?)
+BLOB_CHUNK_SIZE = 64 * 1024
+
+# external content FTS5 index over the searchable columns, kept in sync with Custom_Glyphs by triggers
+CREATE_SEARCH_SQL = [
+    '''
+    CREATE VIRTUAL TABLE IF NOT EXISTS Custom_Glyphs_Search USING fts5(
+        Title, Creator, Youtube_Link,
+        content='Custom_Glyphs', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )
+    ''',
     '''
+    CREATE TRIGGER IF NOT EXISTS Custom_Glyphs_Search_Insert AFTER INSERT ON Custom_Glyphs BEGIN
+        INSERT INTO Custom_Glyphs_Search (rowid, Title, Creator, Youtube_Link) VALUES (new.id, new.Title, new.Creator, new.Youtube_Link);
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS Custom_Glyphs_Search_Delete AFTER DELETE ON Custom_Glyphs BEGIN
+        INSERT INTO Custom_Glyphs_Search (Custom_Glyphs_Search, rowid, Title, Creator, Youtube_Link) VALUES ('delete', old.id, old.Title, old.Creator, old.Youtube_Link);
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS Custom_Glyphs_Search_Update AFTER UPDATE OF Title, Creator, Youtube_Link ON Custom_Glyphs BEGIN
+        INSERT INTO Custom_Glyphs_Search (Custom_Glyphs_Search, rowid, Title, Creator, Youtube_Link) VALUES ('delete', old.id, old.Title, old.Creator, old.Youtube_Link);
+        INSERT INTO Custom_Glyphs_Search (rowid, Title, Creator, Youtube_Link) VALUES (new.id, new.Title, new.Creator, new.Youtube_Link);
+    END
+    ''',
+]
+
+# bm25 weights for Title, Creator and Youtube_Link, a title match counts the most
+SEARCH_WEIGHTS = (10.0, 2.0, 1.0)
+SEARCH_LIMIT = 25
+
+METADATA_COLUMNS = 'id, Title, Youtube_Link, Timestamp, Phone, Creator, Creator_ID'
+
+
+@dataclass(slots=True)
+class GlyphEntry:
+    """
+    Metadata of a custom glyph in the database.
+    """
+    id: int
+    title: str
+    youtube_link: str
+    timestamp: str
+    phone: str
+    creator: str
+    creator_id: int
+
+    @classmethod
+    def from_row(cls, row: tuple) -> "GlyphEntry":
+        return cls(*row)
+
+
+class GlyphDB:
+    """
+    Async access to the custom glyph database.
+
+    Reads run on a small pool of connections in worker threads so searches can run concurrently.
+    Writes go through a single writer that commits everything queued at that point in one transaction.
+    """
+    def __init__(self, path: str, read_pool_size: int = READ_POOL_SIZE):
+        self.path = path
+        self.read_pool_size = read_pool_size
+        self._readers: queue.Queue[sqlite3.Connection] = queue.Queue()
+        self._read_executor: ThreadPoolExecutor | None = None
+        self._writer: sqlite3.Connection | None = None
+        self._write_executor: ThreadPoolExecutor | None = None
+        self._write_queue: asyncio.Queue | None = None
+        self._writer_task: asyncio.Task | None = None
+        self.titles = TitleIndex()
+        self.metadata_cache = LRUCache(METADATA_CACHE_ENTRIES)
+        self.blob_cache = LRUCache(BLOB_CACHE_BYTES, weigh=len)
+
+    def _connect(self, read_only: bool = False) -> sqlite3.Connection:
+        # connections are handed between threads of our executors, but only ever used by one at a time
+        conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        conn.execute('PRAGMA busy_timeout=5000')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        if read_only:
+            conn.execute('PRAGMA query_only=1')
+        return conn
+
+    def _setup(self):
+        self._writer = self._connect()
+        self._writer.execute('PRAGMA journal_mode=WAL')
+        migrate(self._writer)
+        for _ in range(self.read_pool_size):
+            self._readers.put(self._connect(read_only=True))
+
+    async def open(self):
+        """
+        Open the connections and start the writer. Called once when the bot starts.
+        """
+        if self._writer_task is not None:
+            return
+        self._write_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='glyph-db-writer')
+        self._read_executor = ThreadPoolExecutor(max_workers=self.read_pool_size, thread_name_prefix='glyph-db-reader')
+        await asyncio.get_running_loop().run_in_executor(self._write_executor, self._setup)
+        self._write_queue = asyncio.Queue()
+        self._writer_task = asyncio.create_task(self._write_loop())
+        await self.read(lambda conn: self.titles.build(conn.execute('SELECT Title, COUNT(*) FROM Custom_Glyphs GROUP BY Title')))
+        print(f'Opened glyph database {self.path}')
+
+    async def close(self):
+        """
+        Commit pending writes and close all connections. Called when the bot shuts down.
+        """
+        if self._writer_task is None:
+            return
+        await self._write_queue.join()
+        self._writer_task.cancel()
+        self._writer_task = None
+        await asyncio.get_running_loop().run_in_executor(self._write_executor, self._writer.close)
+        self._write_executor.shutdown()
+        self._read_executor.shutdown()
+        while not self._readers.empty():
+            self._readers.get_nowait().close()
+        self._writer = None
+        print(f'Closed glyph database {self.path}')
+
+    async def read(self, func: Callable[[sqlite3.Connection], Any]) -> Any:
+        """
+        Run func(connection) on a pooled read connection in a worker thread.
+        """
+        def run():
+            conn = self._readers.get()
+            try:
+                return func(conn)
+            finally:
+                self._readers.put(conn)
+        return await asyncio.get_running_loop().run_in_executor(self._read_executor, run)
+
+    async def write(self, func: Callable[[sqlite3.Connection], Any]) -> Any:
+        """
+        Queue func(connection) for the writer and wait until it is committed.
+        """
+        future = asyncio.get_running_loop().create_future()
+        await self._write_queue.put((func, future))
+        return await future
+
+    async def _write_loop(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._write_queue.get()]
+            # group commit: everything that queued up while the last batch was committing goes in together
+            while len(batch) < WRITE_BATCH_SIZE and not self._write_queue.empty():
+                batch.append(self._write_queue.get_nowait())
+            try:
+                results = await loop.run_in_executor(self._write_executor, self._commit_batch, batch)
+            except Exception as e:
+                # e.g. the database stayed locked past busy_timeout, fail this batch and keep the writer running
+                print(f'Failed to commit {len(batch)} glyph database writes: {e}')
+                results = [(None, e)] * len(batch)
+            try:
+                for (_, future), (result, error) in zip(batch, results):
+                    if future.done():
+                        continue
+                    if error is not None:
+                        future.set_exception(error)
+                    else:
+                        future.set_result(result)
+            finally:
+                for _ in batch:
+                    self._write_queue.task_done()
+
+    def _commit_batch(self, batch: list) -> list[tuple[Any, BaseException | None]]:
+        conn = self._writer
+        results = []
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            for func, _ in batch:
+                # a savepoint per write so one failing write doesn't take the rest of the batch with it
+                conn.execute('SAVEPOINT write')
+                try:
+                    results.append((func(conn), None))
+                    conn.execute('RELEASE write')
+                except Exception as e:
+                    conn.execute('ROLLBACK TO write')
+                    conn.execute('RELEASE write')
+                    results.append((None, e))
+            conn.execute('COMMIT')
+        except Exception as e:
+            self._rollback(conn)
+            return [(None, e)] * len(batch)
+        return results
+
+    @staticmethod
+    def _rollback(conn: sqlite3.Connection):
+        # a failed rollback must not take the writer down, the next BEGIN starts from a clean connection either way
+        if not conn.in_transaction:
+            return
+        try:
+            conn.execute('ROLLBACK')
+        except sqlite3.Error as e:
+            print(f'Failed to roll back the glyph database: {e}')
+
+    async def insert_glyph(self, title: str, youtube_link: str, timestamp: str, phone: str, creator: str, creator_id: int, compressed_glyphdata: bytes) -> int:
+        """
+        Insert a custom glyph and return its id.
+        """
+        blob_hash = glyph_data_hash(compressed_glyphdata)
+        # the preview and the chunked timeline are made here, once, so searches only ever read the stored PNG
+        # and anything that needs a part of the glyph doesn't have to inflate and parse the whole zip
+        preview, timeline = await asyncio.get_running_loop().run_in_executor(None, derive_glyph_data, compressed_glyphdata)
+
+        def insert(conn: sqlite3.Connection) -> int:
+            blob_id = _store_blob(conn, blob_hash, compressed_glyphdata)
+            cursor = conn.execute(
+                'INSERT INTO Custom_Glyphs (Title, Youtube_Link, Timestamp, Phone, Creator, Creator_ID, Blob_ID) VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (title, youtube_link, timestamp, phone, creator, creator_id, blob_id),
+            )
+            if preview is not None:
+                conn.execute('INSERT INTO Glyph_Previews (Glyph_ID, Png) VALUES (?, ?)', (cursor.lastrowid, preview))
+                conn.execute('INSERT INTO Glyph_Timelines (Glyph_ID, Data) VALUES (?, ?)', (cursor.lastrowid, timeline))
+            return cursor.lastrowid
+        entry_id = await self.write(insert)
+        self.titles.add(title)
+        self._invalidate(entry_id, title)
+        return entry_id
+
+    async def update_glyph(self, entry_id: int, **fields) -> bool:
+        """
+        Update metadata columns of a custom glyph, e.g. update_glyph(1, title="New title"). Returns False if it doesn't exist.
+        """
+        columns = {'title': 'Title', 'youtube_link': 'Youtube_Link', 'timestamp': 'Timestamp', 'phone': 'Phone', 'creator': 'Creator', 'creator_id': 'Creator_ID'}
+        unknown = set(fields) - set(columns)
+        if unknown:
+            raise ValueError(f'Unknown glyph fields: {", ".join(sorted(unknown))}')
+        if not fields:
+            return False
+        assignments = ', '.join(f'{columns[name]} = ?' for name in fields)
+
+        def update(conn: sqlite3.Connection):
+            old = conn.execute('SELECT Title FROM Custom_Glyphs WHERE id=?', (entry_id,)).fetchone()
+            conn.execute(f'UPDATE Custom_Glyphs SET {assignments} WHERE id=?', (*fields.values(), entry_id))
+            return old
+        old = await self.write(update)
+        if old is None:
+            return False
+        self._invalidate(entry_id, old[0], fields.get('title'))
+        if 'title' in fields:
+            self.titles.remove(old[0])
+            self.titles.add(fields['title'])
+        return True
+
+    async def delete_glyph(self, entry_id: int) -> bool:
+        """
+        Delete a custom glyph, and its glyph data if no other glyph shares it. Returns False if it doesn't exist.
+        """
+        def delete(conn: sqlite3.Connection):
+            old = conn.execute('SELECT Title, Blob_ID FROM Custom_Glyphs WHERE id=?', (entry_id,)).fetchone()
+            if old is None:
+                return None
+            conn.execute('DELETE FROM Custom_Glyphs WHERE id=?', (entry_id,))
+            conn.execute('DELETE FROM Glyph_Previews WHERE Glyph_ID=?', (entry_id,))
+            conn.execute('DELETE FROM Glyph_Timelines WHERE Glyph_ID=?', (entry_id,))
+            conn.execute('DELETE FROM Glyph_Blobs WHERE id=? AND NOT EXISTS (SELECT 1 FROM Custom_Glyphs WHERE Blob_ID=?)', (old[1], old[1]))
+            return old
+        old = await self.write(delete)
+        if old is None:
+            return False
+        self._invalidate(entry_id, old[0])
+        self.titles.remove(old[0])
+        return True
+
+    def _invalidate(self, entry_id: int, *titles: str | None):
+        self.metadata_cache.invalidate(('id', entry_id))
+        for title in titles:
+            if title is not None:
+                self.metadata_cache.invalidate(('title', title))
+        self.blob_cache.invalidate(entry_id)
+
+    def cache_stats(self) -> dict:
+        """
+        Get the hit/miss/eviction counters of the metadata and glyph data caches.
+        """
+        return {'metadata': self.metadata_cache.stats(), 'blobs': self.blob_cache.stats()}
+
+    async def _cached_entry(self, key: tuple, sql: str, param) -> GlyphEntry | None:
+        entry = self.metadata_cache.get(key)
+        if entry is not None:
+            return entry
+        version = self.metadata_cache.version
+        row = await self.read(lambda conn: conn.execute(sql, (param,)).fetchone())
+        if row is None:
+            return None
+        entry = GlyphEntry.from_row(row)
+        self.metadata_cache.put(key, entry, version)
+        return entry
+
+    async def get_glyph(self, entry_id: int) -> GlyphEntry | None:
+        """
+        Get the metadata of a custom glyph by id.
+        """
+        return await self._cached_entry(('id', entry_id), f'SELECT {METADATA_COLUMNS} FROM Custom_Glyphs WHERE id=?', entry_id)
+
+    async def get_glyph_by_title(self, title: str) -> GlyphEntry | None:
+        """
+        Get the metadata of a custom glyph by its exact title.
+        """
+        return await self._cached_entry(('title', title), f'SELECT {METADATA_COLUMNS} FROM Custom_Glyphs WHERE Title=? ORDER BY id', title)
+
+    async def get_glyph_data(self, entry_id: int) -> bytes | None:
+        """
+        Get the compressed glyph data of a custom glyph by id.
+
+        Use open_glyph_data instead when the data is only passed on, to avoid loading it into memory at once.
+        """
+        data = self.blob_cache.get(entry_id)
+        if data is not None:
+            return data
+        return await self._read_glyph_data(entry_id)
+
+    async def _read_glyph_data(self, entry_id: int) -> bytes | None:
+        version = self.blob_cache.version
+
+        def select(conn: sqlite3.Connection):
+            return conn.execute(
+                'SELECT b.Data FROM Custom_Glyphs g JOIN Glyph_Blobs b ON b.id = g.Blob_ID WHERE g.id=?', (entry_id,)
+            ).fetchone()
+        row = await self.read(select)
+        if row is None:
+            return None
+        self.blob_cache.put(entry_id, row[0], version)
+        return row[0]
+
+    async def open_glyph_data(self, entry_id: int) -> io.BufferedIOBase | None:
+        """
+        Open the compressed glyph data of a custom glyph as a read-only stream, or None if it has no data.
+
+        Cached and small glyph data is served from memory, anything else is streamed from the blob with its own
+        connection. Close the stream when done.
+        """
+        data = self.blob_cache.get(entry_id)
+        if data is not None:
+            return io.BytesIO(data)
+
+        def select(conn: sqlite3.Connection):
+            return conn.execute(
+                'SELECT g.Blob_ID, b.Size FROM Custom_Glyphs g JOIN Glyph_Blobs b ON b.id = g.Blob_ID WHERE g.id=?', (entry_id,)
+            ).fetchone()
+        row = await self.read(select)
+        if row is None:
+            return None
+        blob_id, size = row
+        # glyphs small enough to be worth caching are read whole so the next request is served from memory
+        if size <= self.blob_cache.max_weight // 16:
+            data = await self._read_glyph_data(entry_id)
+            return io.BytesIO(data) if data is not None else None
+        # connecting and opening the blob touch the disk, keep them off the event loop like every other read
+        reader = await asyncio.get_running_loop().run_in_executor(
+            self._read_executor, lambda: GlyphBlobReader(self._connect(read_only=True), blob_id))
+        return io.BufferedReader(reader, buffer_size=BLOB_CHUNK_SIZE)
+
+    async def get_previews(self, entry_ids: list[int]) -> dict[int, bytes]:
+        """
+        Get the stored heatmap PNGs of several glyphs in one query. Glyphs without a preview are left out.
+        """
+        if not entry_ids:
+            return {}
+        placeholders = ', '.join('?' * len(entry_ids))
+
+        def select(conn: sqlite3.Connection):
+            return conn.execute(f'SELECT Glyph_ID, Png FROM Glyph_Previews WHERE Glyph_ID IN ({placeholders})', entry_ids).fetchall()
+        return dict(await self.read(select))
+
+    async def read_timeline(self, entry_id: int, start_ms: float = 0.0, end_ms: float | None = None) -> GlyphTimeline | None:
+        """
+        Get the part of a glyph between start_ms and end_ms (the whole glyph by default), or None if it has no stored timeline.
+
+        Only the chunks of the window are read from the blob and inflated.
+        """
+        def select(conn: sqlite3.Connection):
+            try:
+                # Glyph_ID is the rowid of Glyph_Timelines
+                blob = conn.blobopen('Glyph_Timelines', 'Data', entry_id, readonly=True)
+            except sqlite3.OperationalError:
+                return None
+            with blob:
+                return GlyphChunkReader(blob).read_window(start_ms, end_ms)
+        return await self.read(select)
+
+    async def browse(self, *, creator_id: int | None = None, phone: str | None = None, before: tuple[str, int] | None = None, limit: int = 10) -> list[GlyphEntry]:
+        """
+        Get a page of glyphs, newest first, optionally only those of one creator or one phone.
+
+        Pass the (timestamp, id) of the last entry of a page as before to get the next page.
+        """
+        conditions, params = [], []
+        if creator_id is not None:
+            conditions.append('Creator_ID = ?')
+            params.append(creator_id)
+        if phone is not None:
+            conditions.append('Phone = ?')
+            params.append(phone)
+        if before is not None:
+            # keyset pagination, every page is an index seek instead of skipping over the previous pages
+            conditions.append('(Timestamp, id) < (?, ?)')
+            params.extend(before)
+        where = f'WHERE {" AND ".join(conditions)}' if conditions else ''
+
+        def select(conn: sqlite3.Connection):
+            return conn.execute(
+                f'SELECT {METADATA_COLUMNS} FROM Custom_Glyphs {where} ORDER BY Timestamp DESC, id DESC LIMIT ?',
+                (*params, limit),
+            ).fetchall()
+        return [GlyphEntry.from_row(row) for row in await self.read(select)]
+
+    async def search(self, query: str, limit: int = 10) -> list[tuple[GlyphEntry, float]]:
+        """
+        Full-text search over title, creator and link, best matches first.
+
+        Every word of the query has to match, the words are matched as prefixes so results show up while typing.
+        Returns (entry, score) pairs, lower scores are better matches.
+        """
+        match = build_match_query(query)
+        if match is None:
+            return []
+        limit = max(1, min(limit, SEARCH_LIMIT))
+        columns = ', '.join(f'g.{column.strip()}' for column in METADATA_COLUMNS.split(','))
+
+        def select(conn: sqlite3.Connection):
+            return conn.execute(
+                f'''
+                SELECT {columns}, bm25(Custom_Glyphs_Search, ?, ?, ?) AS score
+                FROM Custom_Glyphs_Search JOIN Custom_Glyphs g ON g.id = Custom_Glyphs_Search.rowid
+                WHERE Custom_Glyphs_Search MATCH ?
+                ORDER BY score
+                LIMIT ?
+                ''',
+                (*SEARCH_WEIGHTS, match, limit),
+            ).fetchall()
+        rows = await self.read(select)
+        return [(GlyphEntry.from_row(row[:-1]), row[-1]) for row in rows]
+
+
+def _create_table(conn: sqlite3.Connection):
+    conn.execute(CREATE_TABLE_SQL)
+
+
+def _split_blobs(conn: sqlite3.Connection):
+    # move the glyph data of existing rows into Glyph_Blobs, the old column is kept but emptied
+    conn.execute(CREATE_BLOBS_SQL)
+    columns = [row[1] for row in conn.execute('PRAGMA table_info(Custom_Glyphs)')]
+    if 'Blob_ID' in columns:
+        return
+    conn.execute('ALTER TABLE Custom_Glyphs ADD COLUMN Blob_ID INTEGER REFERENCES Glyph_Blobs(id)')
+    conn.execute('''
+        INSERT OR IGNORE INTO Glyph_Blobs (Hash, Size, Data)
+        SELECT sha256(Compressed_Glyphdata), length(Compressed_Glyphdata), Compressed_Glyphdata
+        FROM Custom_Glyphs WHERE Compressed_Glyphdata IS NOT NULL
+    ''')
+    conn.execute('''
+        UPDATE Custom_Glyphs
+        SET Blob_ID = (SELECT id FROM Glyph_Blobs WHERE Hash = sha256(Compressed_Glyphdata)), Compressed_Glyphdata = NULL
+        WHERE Compressed_Glyphdata IS NOT NULL
+    ''')
+
+
+def _create_search_index(conn: sqlite3.Connection):
+    for sql in CREATE_SEARCH_SQL:
+        conn.execute(sql)
+    # index the glyphs that were added before the search index existed
+    conn.execute("INSERT INTO Custom_Glyphs_Search (Custom_Glyphs_Search) VALUES ('rebuild')")
+
+
+def _create_browse_indexes(conn: sqlite3.Connection):
+    # one index per listing, each ending in (Timestamp, id) so keyset pages are a single index range scan
+    conn.execute('CREATE INDEX IF NOT EXISTS Custom_Glyphs_Newest ON Custom_Glyphs (Timestamp DESC, id DESC)')
+    conn.execute('CREATE INDEX IF NOT EXISTS Custom_Glyphs_Creator ON Custom_Glyphs (Creator_ID, Timestamp DESC, id DESC)')
+    conn.execute('CREATE INDEX IF NOT EXISTS Custom_Glyphs_Phone ON Custom_Glyphs (Phone, Timestamp DESC, id DESC)')
+
+
+def _create_previews(conn: sqlite3.Connection):
+    # heatmap PNGs made at insert time, in their own table so listing queries don't read them
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS Glyph_Previews (
+            Glyph_ID INTEGER PRIMARY KEY REFERENCES Custom_Glyphs(id),
+            Png BLOB NOT NULL
+        )
+    ''')
+
+
+def _create_timelines(conn: sqlite3.Connection):
+    # glyph timelines in the chunked format of glyph_codec, filled at insert time or by glyph_bulk.py backfill-timelines
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS Glyph_Timelines (
+            Glyph_ID INTEGER PRIMARY KEY REFERENCES Custom_Glyphs(id),
+            Data BLOB NOT NULL
+        )
+    ''')
+
+
+# Schema migrations, applied in order. The database's user_version is the number of migrations applied,
+# so only append to this list and never change a migration that has been released.
+MIGRATIONS = [
+    _create_table,
+    _split_blobs,
+    _create_search_index,
+    _create_browse_indexes,
+    _create_previews,
+    _create_timelines,
+]
+
+
+def migrate(conn: sqlite3.Connection):
+    """
+    Apply the migrations the database doesn't have yet, each in its own transaction.
+    """
+    conn.create_function('sha256', 1, glyph_data_hash, deterministic=True)
+    version = conn.execute('PRAGMA user_version').fetchone()[0]
+    for number, migration in enumerate(MIGRATIONS[version:], start=version + 1):
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            migration(conn)
+            conn.execute(f'PRAGMA user_version = {number}')
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        print(f'Applied glyph database migration {number}: {migration.__name__.strip("_")}')
+
 
-    # Execute the SQL statement with the values
-    cursor.execute(insert_sql, (Title, Youtube_Link, Timestamp, Phone, Creator, Creator_ID, Compressed_Glyphdata))
+class GlyphBlobReader(io.RawIOBase):
+    """
+    Seekable, read-only file object over a row of Glyph_Blobs using SQLite's incremental blob I/O.
+    """
+    def __init__(self, conn: sqlite3.Connection, blob_id: int):
+        self._conn = conn
+        try:
+            self._blob = conn.blobopen('Glyph_Blobs', 'Data', blob_id, readonly=True)
+        except sqlite3.Error:
+            conn.close()
+            raise
 
-    # Commit and close the connection
-    conn.commit()
-    conn.close()
+    def readable(self) -> bool:
+        return True
 
+    def seekable(self) -> bool:
+        return True
 
-def get_data_by_ID(entry_id):
-    # Connect to the database
-    conn = sqlite3.connect('Custom_Glyphs.db')
-    cursor = conn.cursor()
+    def readinto(self, buffer) -> int:
+        data = self._blob.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
 
-    # Prepare the SQL statement
-    select_sql = 'SELECT * FROM Custom_Glyphs WHERE id=?'
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        self._blob.seek(offset, whence)
+        return self._blob.tell()
 
-    # Execute the SQL statement with the values
-    cursor.execute(select_sql, (entry_id,))
-    result = cursor.fetchone()
+    def tell(self) -> int:
+        return self._blob.tell()
 
-    # Extract the file
-    if result is not None:
-        file_data = result[7]
+    def close(self):
+        if not self.closed:
+            self._blob.close()
+            self._conn.close()
+        super().close()
 
-        # Create folder
-        folder_name = str(entry_id)
-        if not os.path.exists(folder_name):
-            os.makedirs(folder_name)
 
-        # Save the file
-        file_name = os.path.join(folder_name, f'entry_{entry_id}.zip')
-        with open(file_name, 'wb') as file:
-            file.write(file_data)
+def derive_glyph_data(compressed_glyphdata: bytes) -> tuple[bytes | None, bytes | None]:
+    """
+    Make the preview PNG and the chunked timeline stored next to compressed glyph data, (None, None) if it has no usable glyph.
+    """
+    timeline = timeline_from_archive(compressed_glyphdata)
+    if timeline is None:
+        return None, None
+    return derive_timeline_data(timeline)
 
-    # Close the connection
-    conn.close()
 
+def derive_timeline_data(timeline: GlyphTimeline) -> tuple[bytes, bytes]:
+    """
+    Make the preview PNG and the chunked timeline of an already parsed glyph.
+    """
+    return render_preview(timeline), encode_timeline(timeline)
 
-def get_data_by_Title(Title):
-    # Connect to the database
-    conn = sqlite3.connect('Custom_Glyphs.db')
-    cursor = conn.cursor()
 
-    # Prepare the SQL statement
-    select_sql = 'SELECT * FROM Custom_Glyphs WHERE Title=?'
+def glyph_data_hash(data: bytes) -> str:
+    """
+    Get the SHA-256 that compressed glyph data is deduplicated by in Glyph_Blobs.
+    """
+    return hashlib.sha256(data).hexdigest()
 
-    # Execute the SQL statement with the values
-    cursor.execute(select_sql, (Title,))
-    result = cursor.fetchone()
 
-    if result is not None:
-        print("ID:", result[0])
-        print("Title:", result[1])
-        print("Youtube_Link:", result[2])
-        print("Timestamp:", result[3])
-        print("Phone:", result[4])
-        print("Creator:", result[5])
-        print("Creator_ID:", result[6])
+def _store_blob(conn: sqlite3.Connection, blob_hash: str, data: bytes) -> int:
+    # identical glyph data is stored once and shared between entries
+    conn.execute('INSERT INTO Glyph_Blobs (Hash, Size, Data) VALUES (?, ?, ?) ON CONFLICT(Hash) DO NOTHING', (blob_hash, len(data), data))
+    return conn.execute('SELECT id FROM Glyph_Blobs WHERE Hash=?', (blob_hash,)).fetchone()[0]
 
-        # Extract the file
-        file_data = result[7]
 
-        # Create folder
-        folder_name = str(result[0])
-        if not os.path.exists(folder_name):
-            os.makedirs(folder_name)
+def build_match_query(query: str) -> str | None:
+    """
+    Turn user input into an FTS5 MATCH expression of quoted prefix terms, or None if there is nothing to search for.
+    """
+    # quoting every word keeps FTS5 syntax characters in user input from being interpreted
+    terms = [word.replace('"', '""') for word in query.split()]
+    terms = [term for term in terms if any(char.isalnum() for char in term)]
+    if not terms:
+        return None
+    return ' '.join(f'"{term}"*' for term in terms)
 
-        # Save the file
-        file_name = os.path.join(folder_name, f'entry_{result[0]}.zip')
-        with open(file_name, 'wb') as file:
-            file.write(file_data)
 
-    # Close the connection
-    conn.close()
\ No newline at end of file
+glyphs = GlyphDB(DB_PATH)
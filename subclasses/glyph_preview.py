@@ -0,0 +1,101 @@
+if __name__ == "__main__":
+    print("This is a subclass. Please use the main bot.py file.")
+    exit()
+
+# Cheap still previews of glyph timelines: a zones x time heatmap encoded as a palette PNG.
+# They are made once when a glyph is inserted and stored in the database, never while serving a search.
+
+import io
+import struct
+import zipfile
+import zlib
+import numpy as np
+from .glyph_tools import MAX_BRIGHTNESS, GlyphFormatError, GlyphTimeline, load_glyph_file
+
+PREVIEW_WIDTH = 320
+ROW_HEIGHT = {5: 12, 15: 6, 33: 3, 3: 16, 26: 3}
+ROW_GAP = 1
+# glyph files are a few MB at most, larger zip members are not inflated just for a preview
+MAX_MEMBER_BYTES = 16 * 1024 ** 2
+
+# dark blue to white ramp, index 0 is the gap between zones
+_ramp = np.linspace(0.0, 1.0, 255)
+PALETTE = np.concatenate([
+    np.array([[16, 16, 20]], dtype=np.uint8),
+    np.stack([
+        40 + 215 * _ramp ** 1.5,
+        40 + 215 * _ramp ** 1.1,
+        70 + 185 * _ramp ** 0.7,
+    ], axis=1).astype(np.uint8),
+])
+
+
+def heatmap(timeline: GlyphTimeline, width: int = PREVIEW_WIDTH) -> np.ndarray:
+    """
+    Downsample a timeline to (zones x width) brightness, keeping the peak of each time bin so short flashes stay visible.
+    """
+    frames = timeline.frames
+    if len(frames) == 0:
+        return np.zeros((timeline.zones, width), dtype=np.uint16)
+    edges = np.linspace(0, len(frames), width + 1).astype(np.int64)[:-1]
+    edges = np.minimum(edges, len(frames) - 1)
+    return np.maximum.reduceat(frames, edges, axis=0).T
+
+
+def _png(pixels: np.ndarray, palette: np.ndarray) -> bytes:
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data))
+
+    height, width = pixels.shape
+    # every scanline starts with filter type 0
+    raw = np.hstack([np.zeros((height, 1), dtype=np.uint8), pixels]).tobytes()
+    return b''.join([
+        b'\x89PNG\r\n\x1a\n',
+        chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 3, 0, 0, 0)),
+        chunk(b'PLTE', palette.tobytes()),
+        chunk(b'IDAT', zlib.compress(raw, 9)),
+        chunk(b'IEND', b''),
+    ])
+
+
+def render_preview(timeline: GlyphTimeline, width: int = PREVIEW_WIDTH) -> bytes:
+    """
+    Render the zones x time heatmap of a timeline as a PNG, one band per zone.
+    """
+    levels = heatmap(timeline, width)
+    indices = 1 + (levels.astype(np.uint32) * 254 // MAX_BRIGHTNESS).astype(np.uint8)
+    row_height = ROW_HEIGHT.get(timeline.zones, 3)
+    # repeat every zone into a band and put a gap row between bands
+    bands = np.repeat(indices, row_height, axis=0).reshape(timeline.zones, row_height, width)
+    gaps = np.zeros((timeline.zones, ROW_GAP, width), dtype=np.uint8)
+    pixels = np.concatenate([bands, gaps], axis=1).reshape(-1, width)[:-ROW_GAP]
+    return _png(pixels, PALETTE)
+
+
+def timeline_from_archive(data: bytes) -> GlyphTimeline | None:
+    """
+    Parse the glyph in compressed glyph data (a zip with a .nglyph or label file), or None if it has no usable glyph.
+    """
+    try:
+        with zipfile.ZipFile(io.BytesIO(data)) as archive:
+            names = sorted(archive.namelist(), key=lambda name: not name.lower().endswith('.nglyph'))
+            for name in names:
+                if name.lower().endswith(('.nglyph', '.txt')):
+                    if archive.getinfo(name).file_size > MAX_MEMBER_BYTES:
+                        continue
+                    try:
+                        return load_glyph_file(name, archive.read(name))
+                    except (GlyphFormatError, UnicodeDecodeError, KeyError, zipfile.BadZipFile, zlib.error, NotImplementedError, EOFError):
+                        # a corrupt, unsupported or undecodable member, try the next one
+                        continue
+    except (zipfile.BadZipFile, zipfile.LargeZipFile, OSError, ValueError):
+        pass
+    return None
+
+
+def preview_from_archive(data: bytes) -> bytes | None:
+    """
+    Render the preview of compressed glyph data, or None if it has no usable glyph.
+    """
+    timeline = timeline_from_archive(data)
+    return render_preview(timeline) if timeline is not None else None
@@ -0,0 +1,110 @@
+if __name__ == "__main__":
+    print("This is a subclass. Please use the main bot.py file.")
+    exit()
+
+# Checks whether a glyph is in sync with its audio.
+# The brightness rises of the glyph are cross-correlated with the onset envelope of the audio with one FFT product,
+# the lag of the correlation peak is how far the glyph is off.
+
+from dataclasses import dataclass
+import numpy as np
+from .glyph_tools import FRAME_MS, GlyphTimeline
+
+# offsets further than this are not searched, a glyph that far off is a different problem
+MAX_OFFSET_MS = 1500
+# offsets below this are not worth correcting, it's about the latency of the LEDs
+MIN_CORRECTION_MS = 40
+# the peak must stand out this much from the correlation at zero lag to be trusted
+MIN_IMPROVEMENT = 1.15
+
+
+@dataclass(slots=True)
+class SyncResult:
+    """
+    offset_ms is how much later the glyph has to start to line up with the audio, negative if it has to start earlier.
+    score is the normalized correlation at that offset (1.0 is a perfect match), zero_score the one without shifting.
+    """
+    offset_ms: float
+    score: float
+    zero_score: float
+
+    @property
+    def offset_frames(self) -> int:
+        return int(round(self.offset_ms / FRAME_MS))
+
+    @property
+    def should_correct(self) -> bool:
+        return (abs(self.offset_ms) >= MIN_CORRECTION_MS and self.score > 0
+                and self.score >= self.zero_score * MIN_IMPROVEMENT)
+
+
+def glyph_envelope(timeline: GlyphTimeline) -> np.ndarray:
+    """
+    Get the onset strength of a glyph: how much brightness is switched on per frame, summed over all zones.
+    """
+    frames = timeline.frames.astype(np.float32)
+    rises = np.maximum(np.diff(frames, axis=0, prepend=0), 0)
+    return rises.sum(axis=1)
+
+
+def _normalize(envelope: np.ndarray) -> np.ndarray:
+    envelope = envelope - envelope.mean()
+    norm = np.linalg.norm(envelope)
+    return envelope / norm if norm > 0 else envelope
+
+
+def find_offset(glyph: np.ndarray, audio: np.ndarray, max_offset_ms: float = MAX_OFFSET_MS) -> SyncResult:
+    """
+    Find the lag that best aligns the glyph envelope with the audio envelope, both at the glyph frame rate.
+    """
+    if len(glyph) == 0 or len(audio) == 0:
+        return SyncResult(0.0, 0.0, 0.0)
+    glyph, audio = _normalize(glyph.astype(np.float64)), _normalize(audio.astype(np.float64))
+
+    # full cross-correlation in one FFT product, padded so it doesn't wrap around
+    size = 1 << int(len(glyph) + len(audio) - 1).bit_length()
+    correlation = np.fft.irfft(np.fft.rfft(audio, size) * np.conj(np.fft.rfft(glyph, size)), size)
+    max_lag = min(int(max_offset_ms / FRAME_MS), len(audio) - 1, size // 2 - 1)
+    # correlation[lag] pairs audio[t + lag] with glyph[t], negative lags are at the end
+    lags = np.arange(-max_lag, max_lag + 1)
+    window = correlation[lags % size]
+    best = int(np.argmax(window))
+    return SyncResult(float(lags[best] * FRAME_MS), float(window[best]), float(correlation[0]))
+
+
+def check_sync(timeline: GlyphTimeline, audio_envelope: np.ndarray, max_offset_ms: float = MAX_OFFSET_MS) -> SyncResult:
+    """
+    Check how far a glyph is off from the onset envelope of its audio.
+    """
+    return find_offset(glyph_envelope(timeline), audio_envelope, max_offset_ms)
+
+
+def apply_offset(timeline: GlyphTimeline, offset_ms: float) -> GlyphTimeline:
+    """
+    Shift a glyph by offset_ms (later if positive) and keep its length, frames and CUSTOM1 marks moved past either end are dropped.
+    """
+    shift = int(round(offset_ms / FRAME_MS))
+    frames = np.zeros_like(timeline.frames)
+    length = len(frames)
+    # a shift by the whole length or more leaves nothing, the slices below would not line up
+    if 0 <= shift < length:
+        frames[shift:] = timeline.frames[:length - shift]
+    elif -length < shift < 0:
+        frames[:shift] = timeline.frames[-shift:]
+    custom1 = _shift_custom1(timeline.custom1, shift * FRAME_MS, length * FRAME_MS)
+    return GlyphTimeline(timeline.phone_model, frames, custom1, timeline.watermark)
+
+
+def _shift_custom1(entries: list[str], offset_ms: float, duration_ms: float) -> list[str]:
+    # CUSTOM1 entries are "<ms>-<label>", marks that can't be parsed are kept as they are
+    shifted = []
+    for entry in entries:
+        time, separator, label = entry.partition('-')
+        try:
+            ms = int(time) + offset_ms
+        except ValueError:
+            shifted.append(entry)
+            continue
+        if 0 <= ms < duration_ms:
+            shifted.append(f'{int(round(ms))}{separator}{label}')
+    return shifted
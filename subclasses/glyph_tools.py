@@ -2,4 +2,296 @@ if __name__ == "__main__":
     print("This is a subclass. Please use the main bot.py file.")
     exit()
 
-#TODO: Implement calling of SebiAi/custom-nothing-glyph-tools
\ No newline at end of file
+# Native implementation of the file formats of SebiAi/custom-nothing-glyph-tools.
+# A glyph timeline is held as one (frames x zones) uint16 NumPy array instead of lists of strings or dicts.
+
+import base64
+import json
+import math
+import warnings
+import zlib
+from dataclasses import dataclass, field
+import numpy as np
+
+# the Glyph Composer plays one AUTHOR row every 16.666ms
+FRAME_MS = 50 / 3
+MAX_BRIGHTNESS = 4095
+# longest glyph a label file may describe, its frames are allocated before anything is drawn
+MAX_DURATION_MS = 15 * 60 * 1000
+
+# zone counts each phone accepts in the AUTHOR data, the smaller ones are the compatibility modes
+PHONE_ZONES = {
+    'PHONE1': (5, 15),
+    'PHONE2': (5, 33),
+    'PHONE2A': (3, 26),
+}
+
+PHONE_NAMES = {
+    'PHONE1': 'Phone (1)',
+    'PHONE2': 'Phone (2)',
+    'PHONE2A': 'Phone (2a)',
+}
+
+# value of the COMPOSER tag GlyphModder writes for each phone
+PHONE_COMPOSERS = {
+    'PHONE1': 'v1-Spacewar Glyph Composer',
+    'PHONE2': 'v1-Pong Glyph Composer',
+    'PHONE2A': 'v1-Pacman Glyph Composer',
+}
+
+LABEL_MODES = ('LIN', 'EXP', 'LOG')
+
+
+class GlyphFormatError(ValueError):
+    """
+    Raised when a .nglyph or label file is malformed.
+    """
+
+
+@dataclass(slots=True)
+class GlyphTimeline:
+    """
+    A glyph timeline: frames[frame, zone] is the brightness (0-4095) of a zone in one 16.666ms frame.
+    """
+    phone_model: str
+    frames: np.ndarray
+    custom1: list[str] = field(default_factory=list)
+    watermark: str | None = None
+
+    @property
+    def zones(self) -> int:
+        return self.frames.shape[1]
+
+    @property
+    def duration_ms(self) -> float:
+        return self.frames.shape[0] * FRAME_MS
+
+    @property
+    def phone_name(self) -> str:
+        return PHONE_NAMES.get(self.phone_model, self.phone_model)
+
+    def to_author_csv(self) -> str:
+        """
+        Serialize the frames as the AUTHOR text, one comma-terminated line per frame.
+        """
+        if self.frames.size == 0:
+            return ''
+        lines = [','.join(map(str, row)) for row in self.frames.tolist()]
+        return ',\n'.join(lines) + ',\n'
+
+    def to_nglyph(self) -> bytes:
+        """
+        Serialize the timeline as a .nglyph file.
+        """
+        data = {
+            'VERSION': 1,
+            'PHONE_MODEL': self.phone_model,
+            'AUTHOR': self.to_author_csv().splitlines(),
+            'CUSTOM1': self.custom1,
+        }
+        if self.watermark:
+            data['WATERMARK'] = self.watermark.splitlines()
+        return json.dumps(data, indent=4).encode('utf-8')
+
+    def to_ogg_tags(self) -> dict[str, str]:
+        """
+        Get the metadata tags that make an ogg file playable as a glyph ringtone.
+        """
+        return {
+            'TITLE': '',
+            'ALBUM': 'custom',
+            'COMPOSER': PHONE_COMPOSERS[self.phone_model],
+            'AUTHOR': _encode_tag(self.to_author_csv()),
+            'CUSTOM1': _encode_tag(''.join(f'{entry},' for entry in self.custom1)),
+            'CUSTOM2': f'{self.zones}cols',
+        }
+
+
+def _encode_tag(text: str) -> str:
+    return base64.b64encode(zlib.compress(text.encode('utf-8'), zlib.Z_BEST_COMPRESSION)).decode('ascii')
+
+
+def _decode_tag(value: str) -> str:
+    return zlib.decompress(base64.b64decode(value + '=' * (-len(value) % 4))).decode('utf-8')
+
+
+def parse_author(lines: list[str] | str, phone_model: str) -> np.ndarray:
+    """
+    Parse AUTHOR lines into a (frames x zones) uint16 array, validating shape and range in one pass.
+    """
+    if isinstance(lines, str):
+        lines = lines.splitlines()
+    if not isinstance(lines, list):
+        raise GlyphFormatError('AUTHOR must be a list of lines.')
+    for number, line in enumerate(lines, start=1):
+        if not isinstance(line, str):
+            raise GlyphFormatError(f'AUTHOR line {number} is not a string.')
+    lines = [line.strip() for line in lines if line.strip()]
+    if not lines:
+        return np.zeros((0, PHONE_ZONES[phone_model][-1]), dtype=np.uint16)
+
+    zones = len(lines[0].rstrip(',').split(','))
+    if zones not in PHONE_ZONES[phone_model]:
+        raise GlyphFormatError(f'{phone_model} expects {" or ".join(map(str, PHONE_ZONES[phone_model]))} zones per line, got {zones}.')
+
+    text = ','.join(line.rstrip(',') for line in lines)
+    with warnings.catch_warnings():
+        # numpy only warns when it stops at something that isn't a number
+        warnings.simplefilter('error', DeprecationWarning)
+        try:
+            values = np.fromstring(text, dtype=np.int32, sep=',')
+        except (DeprecationWarning, ValueError):
+            raise GlyphFormatError('AUTHOR contains values that are not integers.') from None
+
+    if values.size != len(lines) * zones:
+        counts = np.array([line.rstrip(',').count(',') + 1 for line in lines])
+        bad = int(np.flatnonzero(counts != zones)[0])
+        raise GlyphFormatError(f'AUTHOR line {bad + 1} has {counts[bad]} values, expected {zones}.')
+
+    frames = values.reshape(len(lines), zones)
+    out_of_range = (frames < 0) | (frames > MAX_BRIGHTNESS)
+    if out_of_range.any():
+        frame, zone = np.argwhere(out_of_range)[0]
+        raise GlyphFormatError(f'AUTHOR line {frame + 1}, zone {zone + 1} is {frames[frame, zone]}, brightness must be 0-{MAX_BRIGHTNESS}. '
+                               f'{int(out_of_range.sum())} value(s) are out of range.')
+    return frames.astype(np.uint16)
+
+
+def parse_nglyph(data: bytes | str) -> GlyphTimeline:
+    """
+    Parse a .nglyph file.
+    """
+    try:
+        nglyph = json.loads(data)
+    except (json.JSONDecodeError, UnicodeDecodeError) as e:
+        raise GlyphFormatError(f'Not a valid .nglyph file: {e}') from None
+    if not isinstance(nglyph, dict):
+        raise GlyphFormatError('Not a valid .nglyph file: expected a JSON object.')
+
+    missing = [key for key in ('VERSION', 'PHONE_MODEL', 'AUTHOR') if key not in nglyph]
+    if missing:
+        raise GlyphFormatError(f'The .nglyph file is missing {", ".join(missing)}.')
+    if nglyph['VERSION'] != 1:
+        raise GlyphFormatError(f'Unsupported .nglyph version {nglyph["VERSION"]}.')
+    phone_model = str(nglyph['PHONE_MODEL']).upper()
+    if phone_model not in PHONE_ZONES:
+        raise GlyphFormatError(f'Unknown phone model {nglyph["PHONE_MODEL"]}.')
+
+    watermark = nglyph.get('WATERMARK')
+    if isinstance(watermark, list):
+        watermark = '\n'.join(map(str, watermark))
+    elif watermark is not None and not isinstance(watermark, str):
+        raise GlyphFormatError('WATERMARK must be a string or a list of lines.')
+    custom1 = nglyph.get('CUSTOM1') or []
+    if not isinstance(custom1, list):
+        raise GlyphFormatError('CUSTOM1 must be a list.')
+    return GlyphTimeline(
+        phone_model=phone_model,
+        frames=parse_author(nglyph['AUTHOR'], phone_model),
+        custom1=[str(entry) for entry in custom1],
+        watermark=watermark,
+    )
+
+
+def parse_ogg_tags(tags: dict[str, str]) -> GlyphTimeline:
+    """
+    Rebuild a timeline from the AUTHOR/CUSTOM1 tags of a glyph ringtone.
+    """
+    phone_model = next((model for model, composer in PHONE_COMPOSERS.items() if composer == tags.get('COMPOSER')), None)
+    if phone_model is None:
+        raise GlyphFormatError(f'Unknown glyph composer {tags.get("COMPOSER")}.')
+    try:
+        author = _decode_tag(tags['AUTHOR'])
+        custom1 = _decode_tag(tags['CUSTOM1']) if tags.get('CUSTOM1') else ''
+    except (KeyError, ValueError, zlib.error) as e:
+        raise GlyphFormatError(f'Invalid glyph tags: {e}') from None
+    return GlyphTimeline(phone_model, parse_author(author, phone_model), [entry for entry in custom1.split(',') if entry])
+
+
+def parse_labels(text: str, phone_model: str | None = None) -> GlyphTimeline:
+    """
+    Parse an Audacity label file into a timeline.
+
+    Each label is "start<TAB>end<TAB>zone-from[-to[-mode]]" with times in seconds, a 1-based zone, brightness in percent
+    and an optional LIN/EXP/LOG fade. A label named after the phone model (e.g. PHONE2) sets the model,
+    a label named END sets the total length.
+    """
+    labels = []
+    end_ms = 0.0
+    for line_number, line in enumerate(text.splitlines(), start=1):
+        if not line.strip() or line.startswith('\\'):
+            # lines starting with a backslash hold Audacity's frequency range for the label above
+            continue
+        parts = line.split('\t')
+        if len(parts) != 3:
+            raise GlyphFormatError(f'Label line {line_number} must have start, end and label separated by tabs.')
+        try:
+            start, end = float(parts[0]) * 1000, float(parts[1]) * 1000
+        except ValueError:
+            raise GlyphFormatError(f'Label line {line_number} has an invalid start or end time.') from None
+        if not (math.isfinite(start) and math.isfinite(end)):
+            raise GlyphFormatError(f'Label line {line_number} has an invalid start or end time.')
+        if start < 0 or start > end:
+            raise GlyphFormatError(f'Label line {line_number} must not start before 0 or after its end.')
+        if end > MAX_DURATION_MS:
+            raise GlyphFormatError(f'Label line {line_number} ends after {MAX_DURATION_MS // 60000} minutes, glyphs can\'t be longer.')
+        name = parts[2].strip().upper()
+
+        if name in PHONE_ZONES:
+            phone_model = name
+            continue
+        if name == 'END':
+            end_ms = max(end_ms, start)
+            continue
+
+        fields = name.split('-')
+        try:
+            zone = int(fields[0])
+            level_from = float(fields[1])
+            level_to = float(fields[2]) if len(fields) > 2 else level_from
+        except (ValueError, IndexError):
+            raise GlyphFormatError(f'Label line {line_number}: "{parts[2].strip()}" is not zone-from[-to[-mode]].') from None
+        mode = fields[3] if len(fields) > 3 else 'LIN'
+        if mode not in LABEL_MODES:
+            raise GlyphFormatError(f'Label line {line_number}: unknown mode {mode}, expected one of {", ".join(LABEL_MODES)}.')
+        if not (0 <= level_from <= 100 and 0 <= level_to <= 100):
+            raise GlyphFormatError(f'Label line {line_number}: brightness must be 0-100%.')
+        labels.append((start, end, zone, level_from, level_to, mode))
+        end_ms = max(end_ms, end)
+
+    if phone_model is None:
+        raise GlyphFormatError('The label file does not say which phone it is for, add a PHONE1/PHONE2/PHONE2A label.')
+
+    highest_zone = max((label[2] for label in labels), default=1)
+    zones = next((count for count in PHONE_ZONES[phone_model] if highest_zone <= count), None)
+    if zones is None or min((label[2] for label in labels), default=1) < 1:
+        raise GlyphFormatError(f'{phone_model} has at most {PHONE_ZONES[phone_model][-1]} zones.')
+
+    frames = np.zeros((int(np.ceil(end_ms / FRAME_MS)), zones), dtype=np.float32)
+    for start, end, zone, level_from, level_to, mode in labels:
+        first, last = int(start // FRAME_MS), int(np.ceil(end / FRAME_MS))
+        if last <= first:
+            continue
+        progress = np.linspace(0.0, 1.0, last - first, dtype=np.float32)
+        if mode == 'EXP':
+            progress = np.expm1(progress * 3) / np.expm1(3)
+        elif mode == 'LOG':
+            progress = np.log1p(progress * (np.e ** 3 - 1)) / 3
+        levels = (level_from + (level_to - level_from) * progress) / 100 * MAX_BRIGHTNESS
+        np.maximum(frames[first:last, zone - 1], levels, out=frames[first:last, zone - 1])
+
+    return GlyphTimeline(phone_model, np.rint(frames).astype(np.uint16))
+
+
+def load_glyph_file(filename: str, data: bytes) -> GlyphTimeline:
+    """
+    Parse a .nglyph or label (.txt) file by its extension.
+    """
+    if filename.lower().endswith('.nglyph'):
+        return parse_nglyph(data)
+    if filename.lower().endswith('.txt'):
+        try:
+            return parse_labels(data.decode('utf-8-sig'))
+        except UnicodeDecodeError:
+            raise GlyphFormatError('The label file is not UTF-8 text.') from None
+    raise GlyphFormatError(f'{filename} is not a .nglyph or label file.')
@@ -0,0 +1,262 @@
+if __name__ == "__main__":
+    print("This is a subclass. Please use the main bot.py file.")
+    exit()
+
+# Renders a glyph timeline as a video of the phone's LED layout.
+# Every zone is a precomputed mask, so a batch of frames is a single (frames x zones) @ (zones x pixels) product,
+# and the raw frames are piped into ffmpeg's stdin without ever being written to disk.
+
+import asyncio
+import hashlib
+import os
+import tempfile
+import numpy as np
+from .glyph_tools import FRAME_MS, MAX_BRIGHTNESS, GlyphTimeline
+from .lru_cache import LRUCache
+
+RESOLUTIONS = (360, 480, 720)
+FORMATS = ('mp4', 'gif')
+FPS = {'mp4': 30, 'gif': 15}
+# frames composited per matrix product, bounds the memory of a render regardless of its length
+BATCH_FRAMES = 64
+RENDER_CACHE_BYTES = int(os.getenv('RENDER_CACHE_BYTES', 128 * 1024 ** 2))
+
+BODY_LEVEL = 24
+LED_OFF_LEVEL = 44
+
+_render_cache = LRUCache(RENDER_CACHE_BYTES, weigh=len)
+_mask_cache: dict[tuple[str, int, int], tuple[np.ndarray, np.ndarray]] = {}
+
+
+class RenderError(Exception):
+    """
+    Raised when ffmpeg fails to encode the visualization.
+    """
+    def __init__(self, stderr: str):
+        self.stderr = stderr
+        super().__init__(stderr)
+
+
+# Shapes are in phone coordinates: x from 0 to 1 across the back, y from 0 to 2 top to bottom.
+# Angles are in degrees, clockwise from the right, since y points down.
+
+def _arc(cx, cy, r, a0, a1, thickness=0.035):
+    return ('arc', cx, cy, r, a0, a1, thickness)
+
+
+def _line(x0, y0, x1, y1, thickness=0.035):
+    return ('line', x0, y0, x1, y1, thickness)
+
+
+def _dot(cx, cy, r=0.025):
+    return ('dot', cx, cy, r)
+
+
+def _split_arc(cx, cy, r, a0, a1, count):
+    step = (a1 - a0) / count
+    return [_arc(cx, cy, r, a0 + i * step + 0.8, a0 + (i + 1) * step - 0.8) for i in range(count)]
+
+
+def _split_line(x0, y0, x1, y1, count):
+    points = np.linspace(0.0, 1.0, count + 1)
+    gap = 0.08 / count
+    return [_line(x0 + (x1 - x0) * (a + gap), y0 + (y1 - y0) * (a + gap), x0 + (x1 - x0) * (b - gap), y0 + (y1 - y0) * (b - gap))
+            for a, b in zip(points[:-1], points[1:])]
+
+
+def _phone1_shapes():
+    return [
+        _arc(0.27, 0.22, 0.15, 100, 350),              # A: around the camera
+        _line(0.78, 0.12, 0.58, 0.42),                  # B: diagonal
+        _arc(0.5, 1.0, 0.32, -90, 0),                   # C1-C4: the ring in quarters
+        _arc(0.5, 1.0, 0.32, 0, 90),
+        _arc(0.5, 1.0, 0.32, 90, 180),
+        _arc(0.5, 1.0, 0.32, 180, 270),
+        _dot(0.5, 1.86),                                # E: the dot
+        *_split_line(0.5, 1.42, 0.5, 1.78, 8),          # D1_1-D1_8: the line
+    ]
+
+
+def _phone2_shapes():
+    return [
+        _arc(0.27, 0.22, 0.15, 180, 350),               # A1, A2: around the camera
+        _arc(0.27, 0.22, 0.15, 100, 170),
+        _line(0.78, 0.12, 0.58, 0.42),                  # B: diagonal
+        *_split_arc(0.5, 1.0, 0.32, -90, 0, 16),        # C1_1-C1_16
+        _arc(0.5, 1.0, 0.32, 180, 270),                 # C2-C6: rest of the ring
+        _arc(0.5, 1.0, 0.32, 0, 45),
+        _arc(0.5, 1.0, 0.32, 135, 180),
+        _arc(0.5, 1.0, 0.32, 90, 135),
+        _arc(0.5, 1.0, 0.32, 45, 90),
+        _dot(0.5, 1.86),                                # E
+        *_split_line(0.5, 1.42, 0.5, 1.78, 8),          # D1_1-D1_8
+    ]
+
+
+def _phone2a_shapes():
+    return [
+        *_split_arc(0.5, 0.42, 0.3, 190, 350, 24),      # C1-C24: the arc over the cameras
+        _line(0.5, 0.9, 0.5, 1.3),                      # A
+        _line(0.3, 1.7, 0.7, 1.7),                      # B
+    ]
+
+
+# full layout per phone, and for the compatibility modes which full zones form one zone
+LAYOUTS = {
+    'PHONE1': (_phone1_shapes, {15: None, 5: [[0], [1], [2, 3, 4, 5], [6], list(range(7, 15))]}),
+    'PHONE2': (_phone2_shapes, {33: None, 5: [[0, 1], [2], list(range(3, 24)), [24], list(range(25, 33))]}),
+    'PHONE2A': (_phone2a_shapes, {26: None, 3: [list(range(0, 24)), [24], [25]]}),
+}
+
+
+def _rasterize(shape, x: np.ndarray, y: np.ndarray, pixel: float) -> np.ndarray:
+    kind = shape[0]
+    if kind == 'arc':
+        _, cx, cy, r, a0, a1, thickness = shape
+        distance = np.abs(np.hypot(x - cx, y - cy) - r) - thickness / 2
+        angle = np.degrees(np.arctan2(y - cy, x - cx))
+        inside = ((angle - a0) % 360) <= ((a1 - a0) % 360 or 360)
+        coverage = np.clip(0.5 - distance / pixel, 0.0, 1.0) * inside
+    elif kind == 'line':
+        _, x0, y0, x1, y1, thickness = shape
+        dx, dy = x1 - x0, y1 - y0
+        t = np.clip(((x - x0) * dx + (y - y0) * dy) / (dx * dx + dy * dy), 0.0, 1.0)
+        distance = np.hypot(x - (x0 + t * dx), y - (y0 + t * dy)) - thickness / 2
+        coverage = np.clip(0.5 - distance / pixel, 0.0, 1.0)
+    else:
+        _, cx, cy, r = shape
+        coverage = np.clip(0.5 - (np.hypot(x - cx, y - cy) - r) / pixel, 0.0, 1.0)
+    return coverage.astype(np.float32)
+
+
+def zone_masks(phone_model: str, zones: int, height: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Get the (zones x pixels) LED masks and the unlit background for a phone at a resolution.
+    """
+    key = (phone_model, zones, height)
+    if key in _mask_cache:
+        return _mask_cache[key]
+
+    width = height // 2 - (height // 2) % 2
+    pixel = 2.0 / height
+    y, x = np.mgrid[0:height, 0:width].astype(np.float32)
+    x = (x + 0.5) * pixel + (1.0 - width * pixel) / 2
+    y = (y + 0.5) * pixel
+
+    shapes_factory, modes = LAYOUTS[phone_model]
+    masks = np.stack([_rasterize(shape, x, y, pixel) for shape in shapes_factory()]).reshape(-1, height * width)
+    groups = modes[zones]
+    if groups is not None:
+        masks = np.stack([masks[group].max(axis=0) for group in groups])
+
+    # rounded phone body, with the unlit LEDs slightly brighter than the body
+    corner = 0.12
+    qx = np.maximum(np.abs(x - 0.5) - (0.47 - corner), 0)
+    qy = np.maximum(np.abs(y - 1.0) - (0.97 - corner), 0)
+    body = np.clip(0.5 - (np.hypot(qx, qy) - corner) / pixel, 0.0, 1.0).reshape(-1)
+    background = np.maximum(body * BODY_LEVEL, masks.max(axis=0) * LED_OFF_LEVEL).astype(np.float32)
+
+    _mask_cache[key] = (masks, background)
+    return masks, background
+
+
+def render_frames(timeline: GlyphTimeline, height: int, fps: int, start: int, count: int) -> bytes:
+    """
+    Composite count output frames starting at output frame start into raw gray8 pixels.
+    """
+    masks, background = zone_masks(timeline.phone_model, timeline.zones, height)
+    # sample the 60 fps glyph timeline at the video frame rate
+    indices = ((np.arange(start, start + count) * (1000 / fps)) / FRAME_MS).astype(np.int64)
+    indices = np.minimum(indices, len(timeline.frames) - 1)
+    # perceptual curve so low brightness values are still visible
+    levels = (timeline.frames[indices].astype(np.float32) / MAX_BRIGHTNESS) ** 0.6
+    lit = np.clip(levels @ masks, 0.0, 1.0) * 255
+    return np.maximum(lit, background).astype(np.uint8).tobytes()
+
+
+def render_key(timeline: GlyphTimeline, height: int, output_format: str, audio: bytes | None) -> str:
+    """
+    Get the cache key of a render: the glyph data and audio, phone model, resolution and format.
+    """
+    digest = hashlib.sha256(np.ascontiguousarray(timeline.frames).tobytes())
+    if audio is not None:
+        digest.update(hashlib.sha256(audio).digest())
+    return f'{digest.hexdigest()}:{timeline.phone_model}:{height}:{output_format}'
+
+
+async def render(timeline: GlyphTimeline, height: int = 480, output_format: str = 'mp4', audio: bytes | None = None) -> bytes:
+    """
+    Render a timeline as an MP4 (with the audio muxed in, if given) or a GIF, returned in memory.
+
+    Raises RenderError if ffmpeg fails.
+    """
+    if len(timeline.frames) == 0:
+        raise ValueError('The glyph has no frames to render.')
+    if height not in RESOLUTIONS:
+        raise ValueError(f'Resolution must be one of {RESOLUTIONS}.')
+    if output_format not in FORMATS:
+        raise ValueError(f'Format must be one of {FORMATS}.')
+
+    key = render_key(timeline, height, output_format, audio)
+    cached = _render_cache.get(key)
+    if cached is not None:
+        return cached
+    version = _render_cache.version
+
+    fps = FPS[output_format]
+    width = height // 2 - (height // 2) % 2
+    total = max(1, int(np.ceil(timeline.duration_ms / 1000 * fps)))
+
+    audio_file = None
+    ffmpeg_cmd = ['ffmpeg', '-nostdin', '-f', 'rawvideo', '-pix_fmt', 'gray', '-s', f'{width}x{height}', '-r', str(fps), '-i', 'pipe:0']
+    if output_format == 'mp4':
+        if audio is not None:
+            # the only file we write: ffmpeg needs the audio as a second input next to the frames on stdin
+            audio_file = tempfile.NamedTemporaryFile(suffix='.ogg', delete=False)
+            audio_file.write(audio)
+            audio_file.close()
+            ffmpeg_cmd += ['-i', audio_file.name, '-c:a', 'aac', '-b:a', '160k', '-shortest']
+        ffmpeg_cmd += ['-c:v', 'libx264', '-preset', 'veryfast', '-tune', 'animation', '-pix_fmt', 'yuv420p',
+                       '-movflags', 'frag_keyframe+empty_moov', '-f', 'mp4', 'pipe:1']
+    else:
+        ffmpeg_cmd += ['-f', 'gif', 'pipe:1']
+
+    loop = asyncio.get_running_loop()
+    process = None
+    try:
+        process = await asyncio.create_subprocess_exec(*ffmpeg_cmd, stdin=asyncio.subprocess.PIPE, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE)
+        # read the output while writing frames, otherwise ffmpeg blocks on a full stdout pipe
+        stdout_task = asyncio.create_task(process.stdout.read())
+        stderr_task = asyncio.create_task(process.stderr.read())
+        try:
+            for start in range(0, total, BATCH_FRAMES):
+                count = min(BATCH_FRAMES, total - start)
+                frames = await loop.run_in_executor(None, render_frames, timeline, height, fps, start, count)
+                process.stdin.write(frames)
+                await process.stdin.drain()
+            process.stdin.close()
+        except (BrokenPipeError, ConnectionResetError):
+            # ffmpeg exited early, its stderr says why
+            pass
+        output, stderr = await stdout_task, await stderr_task
+        await process.wait()
+    finally:
+        # cancelled or failed while ffmpeg is still running, don't leave it behind
+        if process is not None and process.returncode is None:
+            process.kill()
+            await process.wait()
+        if audio_file is not None:
+            os.remove(audio_file.name)
+
+    if process.returncode != 0:
+        raise RenderError(stderr.decode(errors='ignore'))
+
+    _render_cache.put(key, output, version)
+    return output
+
+
+def cache_stats() -> dict:
+    """
+    Get the hit/miss counters of the render cache.
+    """
+    return _render_cache.stats()
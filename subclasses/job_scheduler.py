@@ -0,0 +1,188 @@
+if __name__ == "__main__":
+    print("This is a subclass. Please use the main bot.py file.")
+    exit()
+
+import asyncio
+import itertools
+import os
+from collections import defaultdict
+from typing import Any, Awaitable, Callable
+
+MAX_WORKERS = int(os.getenv('MEDIA_JOB_WORKERS', os.cpu_count() or 2))
+MAX_QUEUE = int(os.getenv('MEDIA_JOB_QUEUE', 50))
+MAX_PER_USER = int(os.getenv('MEDIA_JOB_PER_USER', 1))
+MAX_PER_GUILD = int(os.getenv('MEDIA_JOB_PER_GUILD', max(1, MAX_WORKERS // 2)))
+MAX_QUEUED_PER_USER = int(os.getenv('MEDIA_JOB_QUEUED_PER_USER', 3))
+
+
+class QueueFullError(Exception):
+    """
+    Raised when a job is rejected because the queue, or the user's share of it, is full.
+    """
+
+
+class _Job:
+    __slots__ = ('seq', 'user_id', 'guild_id', 'func', 'future', 'on_position', 'position', 'reported', 'reporter')
+
+    def __init__(self, seq, user_id, guild_id, func, future, on_position):
+        self.seq = seq
+        self.user_id = user_id
+        self.guild_id = guild_id
+        self.func = func
+        self.future = future
+        self.on_position = on_position
+        self.position = None
+        self.reported = None
+        # reports the latest position, one at a time so the updates of a job can't overtake each other
+        self.reporter: asyncio.Task | None = None
+
+
+class JobScheduler:
+    """
+    Runs media jobs (downloads, ffmpeg) on a bounded number of workers.
+
+    A job only starts while its user and guild are below their caps, and among the jobs that may start the one
+    whose guild has the fewest running jobs goes first, so one busy guild can't starve the others.
+    """
+    def __init__(self, max_workers: int, max_queue: int, max_per_user: int, max_per_guild: int, max_queued_per_user: int):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.max_per_user = max_per_user
+        self.max_per_guild = max_per_guild
+        self.max_queued_per_user = max_queued_per_user
+        self._pending: list[_Job] = []
+        self._running = 0
+        self._running_by_user: defaultdict[int, int] = defaultdict(int)
+        self._running_by_guild: defaultdict[int, int] = defaultdict(int)
+        self._seq = itertools.count()
+        self.completed = 0
+        self.failed = 0
+        self.cancelled = 0
+        self.rejected = 0
+
+    def stats(self) -> dict:
+        """
+        Get the current load of the scheduler.
+        """
+        return {
+            'running': self._running,
+            'queued': len(self._pending),
+            'max_workers': self.max_workers,
+            'max_queue': self.max_queue,
+            'completed': self.completed,
+            'failed': self.failed,
+            'cancelled': self.cancelled,
+            'rejected': self.rejected,
+        }
+
+    async def submit(self, func: Callable[[], Awaitable[Any]], *, user_id: int, guild_id: int | None = None,
+                     on_position: Callable[[int], Awaitable[None]] | None = None) -> Any:
+        """
+        Run func() once a worker is free and return its result.
+
+        on_position is called with the 1-based queue position whenever it changes while the job waits,
+        never concurrently and never after the job has started. Positions that are out of date before they are reported are skipped.
+        Raises QueueFullError if the job can't be queued.
+        """
+        # DMs and user installs have no guild, give each user their own bucket
+        guild_id = guild_id if guild_id is not None else -user_id
+
+        if len(self._pending) >= self.max_queue:
+            self.rejected += 1
+            raise QueueFullError("The queue is full.")
+        if sum(1 for job in self._pending if job.user_id == user_id) >= self.max_queued_per_user:
+            self.rejected += 1
+            raise QueueFullError("You already have too many jobs queued.")
+
+        job = _Job(next(self._seq), user_id, guild_id, func, asyncio.get_running_loop().create_future(), on_position)
+        self._pending.append(job)
+        self._dispatch()
+
+        try:
+            return await job.future
+        except asyncio.CancelledError:
+            if job in self._pending:
+                self._pending.remove(job)
+                if job.reporter is not None:
+                    job.reporter.cancel()
+                self._notify_positions()
+            raise
+
+    def _can_start(self, job: _Job) -> bool:
+        return (self._running_by_user.get(job.user_id, 0) < self.max_per_user
+                and self._running_by_guild.get(job.guild_id, 0) < self.max_per_guild)
+
+    def _priority(self, job: _Job) -> tuple[int, int]:
+        # the guild with the fewest running jobs goes first, then the oldest job
+        return self._running_by_guild.get(job.guild_id, 0), job.seq
+
+    def _dispatch(self):
+        while self._running < self.max_workers:
+            eligible = [job for job in self._pending if self._can_start(job)]
+            if not eligible:
+                break
+            job = min(eligible, key=self._priority)
+            self._pending.remove(job)
+            self._start(job)
+        self._notify_positions()
+
+    def _start(self, job: _Job):
+        self._running += 1
+        self._running_by_user[job.user_id] += 1
+        self._running_by_guild[job.guild_id] += 1
+        task = asyncio.create_task(self._run(job))
+        task.add_done_callback(lambda done: self._finish(job, done))
+        # if the caller gave up while the job is running there is no one to hand the result to
+        job.future.add_done_callback(lambda future: task.cancel() if future.cancelled() else None)
+
+    @staticmethod
+    async def _run(job: _Job) -> Any:
+        # let a position update that is already on its way land before the job's own messages
+        job.on_position = None
+        if job.reporter is not None:
+            await asyncio.gather(job.reporter, return_exceptions=True)
+        return await job.func()
+
+    def _finish(self, job: _Job, task: asyncio.Task):
+        self._running -= 1
+        if task.cancelled():
+            self.cancelled += 1
+        elif task.exception() is not None:
+            self.failed += 1
+        else:
+            self.completed += 1
+        for counts, key in ((self._running_by_user, job.user_id), (self._running_by_guild, job.guild_id)):
+            counts[key] -= 1
+            if counts[key] == 0:
+                del counts[key]
+
+        if not job.future.done():
+            if task.cancelled():
+                job.future.cancel()
+            elif task.exception() is not None:
+                job.future.set_exception(task.exception())
+            else:
+                job.future.set_result(task.result())
+        self._dispatch()
+
+    def _notify_positions(self):
+        for position, job in enumerate(sorted(self._pending, key=self._priority), start=1):
+            if job.on_position is None or job.position == position:
+                continue
+            job.position = position
+            if job.reporter is None or job.reporter.done():
+                job.reporter = asyncio.create_task(self._report_positions(job))
+
+    @staticmethod
+    async def _report_positions(job: _Job):
+        # a running reporter picks up the newest position when its current report is done
+        while job.on_position is not None and job.reported != job.position:
+            position = job.position
+            try:
+                await job.on_position(position)
+            except Exception as e:
+                print(f'Failed to report queue position {position}: {e}')
+            job.reported = position
+
+
+media_jobs = JobScheduler(MAX_WORKERS, MAX_QUEUE, MAX_PER_USER, MAX_PER_GUILD, MAX_QUEUED_PER_USER)
@@ -0,0 +1,71 @@
+if __name__ == "__main__":
+    print("This is a subclass. Please use the main bot.py file.")
+    exit()
+
+from collections import OrderedDict
+from typing import Any, Callable
+
+
+class LRUCache:
+    """
+    Least recently used cache bounded by total weight, with hit/miss/eviction counters.
+
+    Every invalidation bumps a version. A value read before an invalidation is not stored afterwards,
+    so a read racing with a write can't put stale data back into the cache.
+    """
+    def __init__(self, max_weight: int, weigh: Callable[[Any], int] = lambda value: 1):
+        self.max_weight = max_weight
+        self.weigh = weigh
+        self._entries: OrderedDict[Any, tuple[Any, int]] = OrderedDict()
+        self.weight = 0
+        self.version = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key) -> Any | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return entry[0]
+
+    def put(self, key, value, version: int):
+        if version != self.version:
+            return
+        weight = self.weigh(value)
+        if weight > self.max_weight:
+            return
+        self.invalidate(key, bump=False)
+        self._entries[key] = (value, weight)
+        self.weight += weight
+        while self.weight > self.max_weight:
+            _, (_, evicted_weight) = self._entries.popitem(last=False)
+            self.weight -= evicted_weight
+            self.evictions += 1
+
+    def invalidate(self, key, bump: bool = True):
+        if bump:
+            self.version += 1
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.weight -= entry[1]
+
+    def clear(self):
+        self.version += 1
+        self._entries.clear()
+        self.weight = 0
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': self.hits / total if total else 0.0,
+            'evictions': self.evictions,
+            'entries': len(self._entries),
+            'weight': self.weight,
+            'max_weight': self.max_weight,
+        }
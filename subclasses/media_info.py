@@ -0,0 +1,153 @@
+if __name__ == "__main__":
+    print("This is a subclass. Please use the main bot.py file.")
+    exit()
+
+import asyncio
+import os
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+import yt_dlp as youtube_dl
+
+# How long extracted info stays valid. Direct media URLs inside the info expire after a few hours,
+# so keep this well below that.
+CACHE_TTL = float(os.getenv('YTDL_INFO_TTL', 30 * 60))
+CACHE_SIZE = int(os.getenv('YTDL_INFO_CACHE_SIZE', 256))
+MAX_WORKERS = int(os.getenv('YTDL_INFO_WORKERS', 4))
+
+YOUTUBE_HOSTS = {'youtube.com', 'www.youtube.com', 'm.youtube.com', 'music.youtube.com', 'youtube-nocookie.com', 'www.youtube-nocookie.com'}
+TRACKING_PARAMS = {'si', 'feature', 'pp', 'ab_channel', 'fbclid', 'gclid', 'igshid', 'ref', 'ref_src', 'spm'}
+
+ydl_opts = {
+    'quiet': True,
+    'no_warnings': True,
+    'noplaylist': True,
+    'skip_download': True,
+}
+
+_executor: ThreadPoolExecutor | None = None
+_cache: OrderedDict[str, tuple[float, dict]] = OrderedDict()
+_in_flight: dict[str, asyncio.Future] = {}
+
+
+def canonicalize_url(url: str) -> str:
+    """
+    Normalize a URL so that different spellings of the same video share one cache entry.
+    """
+    parts = urlsplit(url.strip())
+    scheme = (parts.scheme or 'https').lower()
+    host = parts.netloc.lower()
+    path = parts.path
+
+    video_id = None
+    if host == 'youtu.be':
+        video_id = path.lstrip('/').split('/')[0]
+    elif host in YOUTUBE_HOSTS:
+        if path == '/watch':
+            video_id = dict(parse_qsl(parts.query)).get('v')
+        else:
+            segments = path.strip('/').split('/')
+            if len(segments) >= 2 and segments[0] in ('shorts', 'embed', 'live', 'v'):
+                video_id = segments[1]
+    if video_id:
+        return f'https://www.youtube.com/watch?v={video_id}'
+
+    query = [(key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+             if key.lower() not in TRACKING_PARAMS and not key.lower().startswith('utm_')]
+    query.sort()
+    return urlunsplit((scheme, host, path.rstrip('/') or '/', urlencode(query), ''))
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix='ytdl-info')
+    return _executor
+
+
+def _extract(url: str) -> dict:
+    # YoutubeDL instances are not thread-safe, so every extraction gets its own
+    with youtube_dl.YoutubeDL(ydl_opts) as ydl:
+        return ydl.extract_info(url, download=False)
+
+
+def _cache_get(key: str) -> dict | None:
+    entry = _cache.get(key)
+    if entry is None:
+        return None
+    expires_at, info = entry
+    if expires_at < time.monotonic():
+        del _cache[key]
+        return None
+    _cache.move_to_end(key)
+    return info
+
+
+def _cache_put(key: str, info: dict):
+    _cache[key] = (time.monotonic() + CACHE_TTL, info)
+    _cache.move_to_end(key)
+    while len(_cache) > CACHE_SIZE:
+        _cache.popitem(last=False)
+
+
+async def extract_info(url: str) -> dict:
+    """
+    Get the yt-dlp info dict for a URL without blocking the event loop.
+
+    Results are cached by canonical URL, and concurrent calls for the same URL share one extraction.
+    Raises youtube_dl.DownloadError if the extraction fails.
+    """
+    key = canonicalize_url(url)
+
+    info = _cache_get(key)
+    if info is not None:
+        return info
+
+    future = _in_flight.get(key)
+    if future is None:
+        loop = asyncio.get_running_loop()
+        # the canonical URL is only the cache key, some sites need the exact URL the user gave (query, fragment, trailing slash)
+        future = loop.run_in_executor(_get_executor(), _extract, url.strip())
+        future.add_done_callback(lambda done: _on_extracted(key, done))
+        _in_flight[key] = future
+
+    # shielded so a cancelled interaction doesn't cancel the extraction other requests are waiting on
+    return await asyncio.shield(future)
+
+
+def _on_extracted(key: str, future: asyncio.Future):
+    _in_flight.pop(key, None)
+    if not future.cancelled() and future.exception() is None:
+        _cache_put(key, future.result())
+
+
+def select_audio_format(info: dict) -> dict:
+    """
+    Pick the format we download audio from: the best audio-only format, or the best format with audio as a fallback.
+    """
+    formats = [f for f in info.get('formats') or [info] if f.get('acodec') != 'none']
+    if not formats:
+        return info
+    audio_only = [f for f in formats if f.get('vcodec') == 'none']
+    if audio_only:
+        return max(audio_only, key=lambda f: (f.get('abr') or f.get('tbr') or 0, f.get('asr') or 0))
+    # yt-dlp sorts formats from worst to best
+    return formats[-1]
+
+
+def clear_cache():
+    """
+    Drop all cached info dicts.
+    """
+    _cache.clear()
+
+
+def shutdown():
+    """
+    Stop the extraction executor. Called when the bot shuts down.
+    """
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
@@ -0,0 +1,229 @@
+if __name__ == "__main__":
+    print("This is a subclass. Please use the main bot.py file.")
+    exit()
+
+import asyncio
+import hashlib
+import os
+import shutil
+import tempfile
+from collections import OrderedDict
+from pathlib import Path
+import yt_dlp as youtube_dl
+
+CACHE_DIR = os.getenv('SOURCE_CACHE_DIR', os.path.join('cache', 'sources'))
+CACHE_MAX_BYTES = int(os.getenv('SOURCE_CACHE_MAX_BYTES', 2 * 1024 ** 3))
+
+
+class SourceCache:
+    """
+    On-disk cache of downloaded source audio, keyed by video ID and format.
+
+    Files are evicted least recently used first once the cache grows past max_bytes.
+    Files handed out by acquire or fetch are pinned until released and are never evicted while in use.
+    """
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: OrderedDict[str, int] = OrderedDict()
+        self._size = 0
+        self._pins: dict[str, int] = {}
+        self._in_flight: dict[str, asyncio.Future] = {}
+        self._loading: asyncio.Future | None = None
+        self._loaded = False
+
+    def _scan(self) -> list[tuple[str, int]]:
+        # the files left by a previous run, oldest access first, and the leftovers of interrupted downloads removed
+        self.directory.mkdir(parents=True, exist_ok=True)
+        files = [(p.stat(), p.name) for p in self.directory.iterdir() if p.is_file()]
+        files.sort(key=lambda file: file[0].st_mtime)
+        tmp = self.directory / 'tmp'
+        if tmp.is_dir():
+            shutil.rmtree(tmp, ignore_errors=True)
+        return [(name, stat.st_size) for stat, name in files]
+
+    async def load(self):
+        """
+        Rebuild the LRU order from the cache directory in a worker thread. Called once when the bot starts,
+        lookups wait for it otherwise.
+        """
+        if self._loaded:
+            return
+        if self._loading is None:
+            self._loading = asyncio.ensure_future(asyncio.to_thread(self._scan))
+        files = await asyncio.shield(self._loading)
+        if self._loaded:
+            return
+        for name, size in files:
+            self._entries[name] = size
+            self._size += size
+        self._loaded = True
+
+    @staticmethod
+    def key(info: dict, audio_format: dict) -> str:
+        """
+        Get the cache key for a video and the format chosen for it.
+        """
+        source = f"{info.get('extractor_key')}:{info['id']}:{audio_format.get('format_id')}"
+        digest = hashlib.sha256(source.encode('utf-8')).hexdigest()[:32]
+        return f"{digest}.{audio_format.get('ext') or 'bin'}"
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    def stats(self) -> dict:
+        """
+        Get the hit/miss counters and current size of the cache.
+        """
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': self.hits / total if total else 0.0,
+            'evictions': self.evictions,
+            'entries': len(self._entries),
+            'bytes': self._size,
+            'max_bytes': self.max_bytes,
+        }
+
+    async def lookup(self, key: str) -> Path | None:
+        """
+        Get the cached file for a key and mark it as recently used, or None if it isn't cached.
+
+        Pin the key first, the file is touched in a worker thread and could be evicted meanwhile.
+        """
+        await self.load()
+        if key not in self._entries:
+            return None
+        self._entries.move_to_end(key)
+        path = self.directory / key
+        # the mtime keeps the LRU order across restarts
+        if not await asyncio.to_thread(_touch, path):
+            if key in self._entries:
+                self._size -= self._entries.pop(key)
+            return None
+        return path
+
+    async def acquire(self, info: dict, audio_format: dict) -> Path | None:
+        """
+        Get the cached source audio for a video, counting the hit or miss, or None if it isn't cached.
+
+        The returned file is pinned, hand it to release once it has been read.
+        """
+        key = self.key(info, audio_format)
+        self._pin(key)
+        path = await self.lookup(key)
+        if path is None:
+            self.release(self.directory / key)
+            self.misses += 1
+            return None
+        self.hits += 1
+        print(f'Source cache hit: {key}')
+        return path
+
+    async def fetch(self, info: dict, audio_format: dict) -> Path:
+        """
+        Download the source audio for a video into the cache, after acquire missed.
+
+        Concurrent fetches of the same source share one download. The returned file is pinned, hand it to release once it has been read.
+        Raises youtube_dl.DownloadError if the download fails.
+        """
+        key = self.key(info, audio_format)
+        # pinned before the download finishes so another download can't evict it before the caller gets it
+        self._pin(key)
+        try:
+            path = await self.lookup(key)
+            if path is not None:
+                return path
+            future = self._in_flight.get(key)
+            if future is None:
+                loop = asyncio.get_running_loop()
+                future = loop.run_in_executor(None, self._download, info, audio_format, key)
+                future.add_done_callback(lambda done: self._on_downloaded(key, done))
+                self._in_flight[key] = future
+            return await asyncio.shield(future)
+        except BaseException:
+            self.release(self.directory / key)
+            raise
+
+    def release(self, path: Path):
+        """
+        Unpin a file returned by acquire or fetch.
+        """
+        key = path.name
+        pins = self._pins.get(key, 0) - 1
+        if pins > 0:
+            self._pins[key] = pins
+            return
+        self._pins.pop(key, None)
+        # eviction may have been held back by this file
+        self._evict()
+
+    def _pin(self, key: str):
+        self._pins[key] = self._pins.get(key, 0) + 1
+
+    def _download(self, info: dict, audio_format: dict, key: str) -> Path:
+        tmp = self.directory / 'tmp'
+        tmp.mkdir(parents=True, exist_ok=True)
+        with tempfile.TemporaryDirectory(dir=tmp) as work_dir:
+            ydl_opts = {
+                'format': audio_format['format_id'],
+                'outtmpl': os.path.join(work_dir, 'source.%(ext)s'),
+                'noplaylist': True,
+                'quiet': True,
+                'no_warnings': True,
+            }
+            with youtube_dl.YoutubeDL(ydl_opts) as ydl:
+                ydl.process_ie_result(dict(info), download=True)
+            downloaded = [p for p in Path(work_dir).iterdir() if p.is_file() and not p.name.endswith('.part')]
+            if not downloaded:
+                raise youtube_dl.DownloadError(f"yt-dlp did not produce a file for {info.get('id')}")
+            # same filesystem, so this is an atomic rename and readers never see a half written file
+            path = self.directory / key
+            os.replace(downloaded[0], path)
+        return path
+
+    def _on_downloaded(self, key: str, future: asyncio.Future):
+        self._in_flight.pop(key, None)
+        if future.cancelled() or future.exception() is not None:
+            return
+        path = future.result()
+        size = path.stat().st_size
+        self._size += size - self._entries.get(key, 0)
+        self._entries[key] = size
+        self._entries.move_to_end(key)
+        self._evict(keep=key)
+
+    def _evict(self, keep: str | None = None):
+        if self._size <= self.max_bytes:
+            return
+        # oldest first, skipping the files that are being read
+        for key, size in list(self._entries.items()):
+            if self._size <= self.max_bytes:
+                break
+            if key == keep or key in self._pins:
+                continue
+            del self._entries[key]
+            self._size -= size
+            self.evictions += 1
+            try:
+                (self.directory / key).unlink()
+            except OSError:
+                # already gone, or still open by an ffmpeg process on Windows
+                pass
+            print(f'Source cache evicted: {key} ({size} bytes)')
+
+
+def _touch(path: Path) -> bool:
+    try:
+        os.utime(path)
+        return True
+    except FileNotFoundError:
+        return False
+
+
+source_cache = SourceCache(CACHE_DIR, CACHE_MAX_BYTES)
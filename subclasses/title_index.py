@@ -0,0 +1,137 @@
+if __name__ == "__main__":
+    print("This is a subclass. Please use the main bot.py file.")
+    exit()
+
+import os
+import sys
+import time
+from bisect import bisect_left, insort
+from typing import Iterable
+
+TITLE_INDEX_MAX_BYTES = int(os.getenv('TITLE_INDEX_MAX_BYTES', 64 * 1024 ** 2))
+# Discord rejects the whole autocomplete response if a choice is longer than this
+MAX_CHOICE_LENGTH = 100
+
+
+def normalize(title: str) -> str:
+    return ' '.join(title.casefold().split())
+
+
+class TitleIndex:
+    """
+    In-memory prefix index of glyph titles for autocomplete.
+
+    Titles are kept in a sorted list so a prefix lookup is a bisect followed by a short scan.
+    Every title counts the glyphs using it and leaves the index when the last of them is deleted or renamed.
+    Once the index reaches max_bytes new titles are no longer added.
+    """
+    def __init__(self, max_bytes: int = TITLE_INDEX_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._keys: list[str] = []
+        self._titles: dict[str, str] = {}
+        self._counts: dict[str, int] = {}
+        self._bytes = 0
+        self.build_seconds = 0.0
+        self.dropped = 0
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def stats(self) -> dict:
+        """
+        Get the size of the index and how long the last build took.
+        """
+        return {
+            'titles': len(self._keys),
+            'bytes': self._bytes,
+            'max_bytes': self.max_bytes,
+            'dropped': self.dropped,
+            'build_seconds': self.build_seconds,
+        }
+
+    @staticmethod
+    def _cost(key: str, title: str) -> int:
+        # the key string, the title string (if it differs), a list slot and two dict entries
+        cost = sys.getsizeof(key) + 8 + 128
+        if title != key:
+            cost += sys.getsizeof(title)
+        return cost
+
+    def build(self, titles: Iterable[tuple[str, int]]):
+        """
+        Replace the index with the given titles and the number of glyphs using each of them.
+        """
+        start = time.perf_counter()
+        self._keys = []
+        self._titles = {}
+        self._counts = {}
+        self._bytes = 0
+        self.dropped = 0
+        for title, count in titles:
+            if not title:
+                continue
+            key = normalize(title)
+            if key in self._titles:
+                self._counts[key] += count
+                continue
+            cost = self._cost(key, title)
+            if self._bytes + cost > self.max_bytes:
+                self.dropped += 1
+                continue
+            self._titles[key] = title
+            self._counts[key] = count
+            self._keys.append(key)
+            self._bytes += cost
+        self._keys.sort()
+        self.build_seconds = time.perf_counter() - start
+        print(f'Built title index: {len(self._keys)} titles, {self._bytes} bytes in {self.build_seconds * 1000:.1f}ms')
+
+    def add(self, title: str):
+        """
+        Add a newly inserted title to the index.
+        """
+        if not title:
+            return
+        key = normalize(title)
+        if key in self._titles:
+            self._counts[key] += 1
+            return
+        cost = self._cost(key, title)
+        if self._bytes + cost > self.max_bytes:
+            self.dropped += 1
+            return
+        self._titles[key] = title
+        self._counts[key] = 1
+        insort(self._keys, key)
+        self._bytes += cost
+
+    def remove(self, title: str):
+        """
+        Remove the title of a deleted or renamed glyph, once no other glyph uses it.
+        """
+        if not title:
+            return
+        key = normalize(title)
+        if key not in self._titles:
+            return
+        self._counts[key] -= 1
+        if self._counts[key] > 0:
+            return
+        self._bytes -= self._cost(key, self._titles.pop(key))
+        del self._counts[key]
+        del self._keys[bisect_left(self._keys, key)]
+
+    def complete(self, prefix: str, limit: int = 25) -> list[str]:
+        """
+        Get up to limit titles starting with prefix, in alphabetical order, cut to what Discord accepts as a choice.
+        """
+        prefix = normalize(prefix)
+        results = []
+        index = bisect_left(self._keys, prefix)
+        while index < len(self._keys) and len(results) < limit:
+            key = self._keys[index]
+            if not key.startswith(prefix):
+                break
+            results.append(self._titles[key][:MAX_CHOICE_LENGTH])
+            index += 1
+        return results